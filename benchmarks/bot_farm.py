@@ -0,0 +1,119 @@
+"""
+Seeded games played by the scripted bot on every level, spread over a process pool, to tune the difficulty curve.
+
+    python -m benchmarks.bot_farm                        plays 1000 games per level on every core
+    python -m benchmarks.bot_farm --games 200 --levels 1 4 7 --processes 2
+    python -m benchmarks.bot_farm --json farm.json       also writes the report as JSON
+
+Time to exit is game time, ticks per second is simulation throughput of a single core without level generation.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from enums.game_status import GameStatus
+from services.simulation_service.mine_bot import MineBot
+from services.simulation_service.mine_simulation import MineSimulation
+
+batch_size = 25
+
+
+def play_batch(batch: tuple) -> tuple:
+    """
+    Plays a batch of games of a level in a worker process.
+    :param batch: Level, first seed, number of games, maximum number of ticks per game, columns and rows.
+    :return: Level, list of statuses, ticks and damages, and the seconds spent on playing.
+    """
+
+    level, first_seed, game_amount, max_ticks, columns, rows = batch
+    games, play_duration = [], 0.0
+    for seed in range(first_seed, first_seed + game_amount):
+        simulation = MineSimulation(columns, rows)
+        simulation.initialize_objects(level, seed=seed)
+
+        start_time = time.perf_counter()
+        status, ticks, damage = MineBot(simulation).play(max_ticks)
+        play_duration += time.perf_counter() - start_time
+        games.append((status.value, ticks, damage))
+    return level, games, play_duration
+
+
+def summarize(level: int, games: list, play_duration: float) -> dict:
+    """
+    Sums up the games of a level.
+    :param level: Mine depth.
+    :param games: List of statuses, ticks and damages.
+    :param play_duration: Seconds spent on playing the games.
+    :return: Report of the level.
+    """
+
+    exit_ticks = [ticks for status, ticks, _ in games if status == GameStatus.COMPLETE.value]
+    ticks = sum(ticks for _, ticks, _ in games)
+    return {
+        "level": level,
+        "games": len(games),
+        "win_rate": len(exit_ticks) / len(games),
+        "death_rate": sum(1 for status, _, _ in games if status == GameStatus.DEAD.value) / len(games),
+        "median_exit_seconds": statistics.median(exit_ticks) * MineSimulation.tick_duration if exit_ticks else None,
+        "mean_damage": statistics.mean(damage for _, _, damage in games),
+        "ticks_per_second": ticks / play_duration if play_duration else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Treasure Mine bot farm")
+    parser.add_argument("--games", type=int, default=1000, help="number of games per level")
+    parser.add_argument("--levels", type=int, nargs="+", default=range(1, MineSimulation.max_level_multiplier + 1))
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--max-seconds", type=float, default=300, help="game time before a game is given up")
+    parser.add_argument("--columns", type=int, default=MineSimulation.tile_amount * 2, help="map width in tiles")
+    parser.add_argument("--rows", type=int, default=MineSimulation.tile_amount, help="map height in tiles")
+    parser.add_argument("--json", default=None, help="report file path")
+    arguments = parser.parse_args()
+
+    max_ticks = int(arguments.max_seconds / MineSimulation.tick_duration)
+    batches = [
+        (level, level * 1000000 + i, min(batch_size, arguments.games - i), max_ticks, arguments.columns, arguments.rows)
+        for level in arguments.levels
+        for i in range(0, arguments.games, batch_size)
+    ]
+
+    start_time = time.perf_counter()
+    level_games = {level: [] for level in arguments.levels}
+    level_durations = {level: 0.0 for level in arguments.levels}
+    with multiprocessing.Pool(arguments.processes) as pool:
+        for level, games, play_duration in pool.imap_unordered(play_batch, batches):
+            level_games[level].extend(games)
+            level_durations[level] += play_duration
+    wall_duration = time.perf_counter() - start_time
+
+    reports = [summarize(level, level_games[level], level_durations[level]) for level in arguments.levels]
+    print(f"{'level':>5}{'games':>7}{'win':>8}{'death':>8}{'exit':>9}{'damage':>9}{'ticks/s':>10}")
+    for report in reports:
+        exit_seconds = report["median_exit_seconds"]
+        print(
+            f"{report['level']:>5}{report['games']:>7}{report['win_rate']:>8.1%}{report['death_rate']:>8.1%}"
+            f"{'-' if exit_seconds is None else f'{exit_seconds:.1f}s':>9}{report['mean_damage']:>9.1f}"
+            f"{report['ticks_per_second']:>10,.0f}"
+        )
+
+    total_ticks = sum(ticks for games in level_games.values() for _, ticks, _ in games)
+    print(
+        f"{sum(report['games'] for report in reports)} games on {arguments.processes} processes in "
+        f"{wall_duration:.1f}s, {total_ticks / wall_duration:,.0f} ticks/s overall"
+    )
+
+    if arguments.json is not None:
+        with open(arguments.json, "w") as file:
+            report = {"processes": arguments.processes, "wall_seconds": wall_duration, "levels": reports}
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""
+Headless replay of an input recording, made by running the game with RECORD_PATH set.
+
+    python -m benchmarks.replay_inputs inputs.bin              replays once and checks the final state hash
+    python -m benchmarks.replay_inputs inputs.bin --repeat 20  replays again and again as a load generator
+    PROFILER=1 python -m benchmarks.replay_inputs inputs.bin   also times the action generator hot paths
+"""
+
+import argparse
+import sys
+
+from services.interaction_service.action_generator import ActionGenerator
+from services.interaction_service.input_replayer import InputReplayer
+from services.performance_service.profiler import Profiler
+
+hot_paths = ("move_player", "move_creatures", "hit_object", "hit_by_creature")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Treasure Mine input replay")
+    parser.add_argument("path", help="recording file path")
+    parser.add_argument("--repeat", type=int, default=1, help="number of replays")
+    arguments = parser.parse_args()
+
+    if Profiler.is_enabled:
+        for name in hot_paths:
+            setattr(ActionGenerator, name, Profiler.timed(f"ActionGenerator.{name}")(getattr(ActionGenerator, name)))
+
+    replayer = InputReplayer(arguments.path)
+    mismatches = 0
+    for i in range(arguments.repeat):
+        is_matched, ticks, duration = replayer.run()
+        mismatches += not is_matched
+        print(f"replay {i + 1}: {ticks} ticks in {duration * 1e3:.1f}ms ({ticks / max(duration, 1e-9):,.0f} ticks/s) "
+              f"{'matched' if is_matched else 'MISMATCHED'}")
+
+    if Profiler.is_enabled:
+        print(Profiler.summary(limit=len(hot_paths) + 4))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
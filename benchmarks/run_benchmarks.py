@@ -0,0 +1,272 @@
+"""
+Headless benchmarks of level generation, collision and combat at scaled map sizes and every level multiplier.
+
+    python -m benchmarks.run_benchmarks             compares against the baselines, fails on a regression
+    python -m benchmarks.run_benchmarks --update    records the current results as the new baselines
+    python -m benchmarks.run_benchmarks --quick     runs a smaller matrix
+
+Baselines depend on the machine, record them again before comparing on a different one.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable
+
+from enums.entity_kind import EntityKind
+from services.simulation_service.mine_simulation import MineSimulation
+from services.simulation_service.tile_grid import neighbor_offsets
+
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+tile_amounts, quick_tile_amounts = (20, 50, 100, 200, 400), (20, 100)
+levels = tuple(range(1, MineSimulation.max_level_multiplier + 1))
+quick_levels = (1, 4, MineSimulation.max_level_multiplier)
+repeat, call_amount, default_threshold = 5, 1000, 1.5
+
+
+def create_simulation(tile_amount: int, level: int, object_step: int = 3) -> MineSimulation:
+    """
+    Creates a level without validating it, as the game would on a map with the given tile amount. The map is
+    twice as wide as high, like a wide screen, and is filled up to the given step of object creation.
+    :param tile_amount: Number of tiles along the shorter side of the map.
+    :param level: Mine depth.
+    :param object_step: 0 for an empty map, 1 with the character, 2 with the obstacles and 3 with the creatures.
+    :return: Simulation of the level.
+    """
+
+    simulation = MineSimulation(tile_amount * 2, tile_amount)
+    simulation.tile_amount = tile_amount
+    simulation._reset_level(level, seed=tile_amount * 100 + level)
+
+    object_creators = simulation.create_character, simulation.create_obstacles, simulation.create_creatures
+    for create_objects in object_creators[:object_step]:
+        create_objects()
+    return simulation
+
+
+def surround_character(simulation: MineSimulation, kind: EntityKind) -> None:
+    """
+    Moves the character next to as many objects of the kind as possible, looking around a sample of them.
+    :param simulation: Simulation of the level.
+    :param kind: Entity kind.
+    :return:
+    """
+
+    entities, grid = simulation.entities, simulation.grid
+    best_tile, best_amount = None, -1
+    for i in entities.ids(kind)[:50]:
+        column, row = entities.get_position(i)
+        for offset_column, offset_row in neighbor_offsets:
+            tile = column + offset_column, row + offset_row
+            if not grid.is_inside(*tile):
+                continue
+
+            amount = sum(1 for j in grid.neighbors(*tile) if j is not None and entities.kind(j) == kind)
+            if amount > best_amount:
+                best_tile, best_amount = tile, amount
+
+    if best_tile is not None:
+        entities.set_position(simulation.character_id, *best_tile)
+
+
+def measure(setup: Callable, run: Callable, number: int) -> float:
+    """
+    Runs the benchmark on a fresh state for every repeat, leaving the setup out of the measurement.
+    :param setup: Function returning the state.
+    :param run: Function running the benchmark on the state.
+    :param number: Number of operations run by the benchmark.
+    :return: Median duration of an operation in seconds.
+    """
+
+    durations = []
+    for _ in range(repeat):
+        state = setup()
+        start_time = time.perf_counter()
+        run(state)
+        durations.append((time.perf_counter() - start_time) / number)
+    return statistics.median(durations)
+
+
+def bench_create_obstacles(tile_amount: int, level: int) -> float:
+    return measure(
+        lambda: create_simulation(tile_amount, level, object_step=1),
+        lambda simulation: simulation.create_obstacles(),
+        1
+    )
+
+
+def bench_create_creatures(tile_amount: int, level: int) -> float:
+    return measure(
+        lambda: create_simulation(tile_amount, level, object_step=2),
+        lambda simulation: simulation.create_creatures(),
+        1
+    )
+
+
+def bench_check_collision(tile_amount: int, level: int) -> float:
+    def setup():
+        simulation = create_simulation(tile_amount, level)
+        tiles = [
+            (simulation.random.randrange(simulation.columns), simulation.random.randrange(simulation.rows))
+            for _ in range(call_amount)
+        ]
+        return simulation, tiles
+
+    def run(state):
+        simulation, tiles = state
+        check_collision, grid = simulation.action_generator._check_collision, simulation.grid
+        for column, row in tiles:
+            check_collision(grid, column, row)
+
+    return measure(setup, run, call_amount)
+
+
+def bench_move_creatures(tile_amount: int, level: int) -> float:
+    def run(simulation):
+        # the chance the game moves the creatures with, about one move per call
+        for _ in range(call_amount):
+            simulation.action_generator.move_creatures(simulation.entities, simulation.grid)
+
+    return measure(lambda: create_simulation(tile_amount, level), run, call_amount)
+
+
+def bench_move_all_creatures(tile_amount: int, level: int) -> float:
+    number = max(1, call_amount // tile_amount)  # every call moves the whole population, which grows with the map
+
+    def run(simulation):
+        for _ in range(number):
+            simulation.action_generator.move_creatures(simulation.entities, simulation.grid, move_chance=1)
+
+    return measure(lambda: create_simulation(tile_amount, level), run, number)
+
+
+def bench_hit_object(tile_amount: int, level: int) -> float:
+    def setup():
+        simulation = create_simulation(tile_amount, level)
+        surround_character(simulation, EntityKind.OBSTACLE)
+        return simulation
+
+    def run(simulation):
+        # zero damage keeps every obstacle in place, so each call does the same amount of work
+        for _ in range(call_amount):
+            simulation.action_generator.hit_object(
+                simulation.entities, simulation.grid, simulation.character_id, (0, 0), True, simulation.path_finder
+            )
+
+    return measure(setup, run, call_amount)
+
+
+def bench_hit_by_creature(tile_amount: int, level: int) -> float:
+    def setup():
+        simulation = create_simulation(tile_amount, level)
+        surround_character(simulation, EntityKind.CREATURE)
+        simulation.entities.set_health(simulation.character_id, 10 ** 9)
+        return simulation
+
+    def run(simulation):
+        for _ in range(call_amount):
+            simulation.action_generator.hit_by_creature(simulation.entities, simulation.grid, simulation.character_id)
+
+    return measure(setup, run, call_amount)
+
+
+benchmarks = {
+    "create_obstacles": bench_create_obstacles,
+    "create_creatures": bench_create_creatures,
+    "check_collision": bench_check_collision,
+    "move_creatures": bench_move_creatures,
+    "move_all_creatures": bench_move_all_creatures,
+    "hit_object": bench_hit_object,
+    "hit_by_creature": bench_hit_by_creature,
+}
+
+
+def run_benchmarks(selected_tile_amounts: tuple, selected_levels: tuple, name_filter: str = None) -> dict:
+    """
+    Runs every benchmark on every map size and level.
+    :param selected_tile_amounts: Numbers of tiles along the shorter side of the map.
+    :param selected_levels: Mine depths.
+    :param name_filter: Part of the benchmark name to be run, all if not given.
+    :return: Median duration of an operation in seconds per result name.
+    """
+
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if name_filter is not None and name_filter not in name:
+            continue
+
+        for tile_amount in selected_tile_amounts:
+            for level in selected_levels:
+                results[f"{name}/tiles={tile_amount}/level={level}"] = benchmark(tile_amount, level)
+    return results
+
+
+def compare(results: dict, baselines: dict, threshold: float) -> list:
+    """
+    Prints the results next to their baselines.
+    :param results: Median durations per result name.
+    :param baselines: Baseline durations per result name.
+    :param threshold: Ratio to the baseline above which a result is a regression.
+    :return: List of regressed result names.
+    """
+
+    regressions = []
+    print(f"{'benchmark':<44}{'result':>12}{'baseline':>12}{'ratio':>8}")
+    for name, duration in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<44}{duration * 1e6:>10.2f}us{'-':>12}{'-':>8}")
+            continue
+
+        ratio = duration / baseline
+        is_regression = ratio > threshold
+        if is_regression:
+            regressions.append(name)
+        print(
+            f"{name:<44}{duration * 1e6:>10.2f}us{baseline * 1e6:>10.2f}us{ratio:>8.2f}{' REGRESSION' * is_regression}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Treasure Mine benchmarks")
+    parser.add_argument("--update", action="store_true", help="record the results as the new baselines")
+    parser.add_argument("--quick", action="store_true", help="run fewer map sizes and levels")
+    parser.add_argument("--filter", default=None, help="run only the benchmarks whose name contains the text")
+    parser.add_argument("--baseline", default=baseline_path, help="baseline file path")
+    parser.add_argument("--threshold", type=float, default=None, help="allowed ratio to the baseline")
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(
+        quick_tile_amounts if arguments.quick else tile_amounts,
+        quick_levels if arguments.quick else levels,
+        arguments.filter
+    )
+
+    stored = {"threshold": default_threshold, "results": {}}
+    if os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as file:
+            stored = json.load(file)
+    threshold = arguments.threshold or stored.get("threshold", default_threshold)
+
+    regressions = compare(results, stored["results"], threshold)
+
+    if arguments.update:
+        stored["results"].update(results)
+        stored["threshold"] = threshold
+        with open(arguments.baseline, "w") as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+        print(f"Recorded {len(results)} baselines to {arguments.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} of {len(results)} benchmarks regressed beyond {threshold:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
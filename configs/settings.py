@@ -11,3 +11,17 @@ is_production = environment.upper() == EnvironmentType.PRODUCTION.value
 app_name = "Treasure Mine"
 app_icon = "static/images/game_logo.png"
 app_track = "static/sounds/game_music.wav"
+
+is_startup_report = os.getenv("STARTUP_REPORT", "0") == "1"
+is_endless = os.getenv("ENDLESS", "0") == "1"
+map_scale = max(1, int(os.getenv("MAP_SCALE", "1")))
+# only a single screen mine is baked, a larger one could exceed the maximum texture size and would not be culled
+is_static_cache = os.getenv("STATIC_CACHE", "0") == "1" and not is_endless and map_scale == 1
+save_path = os.getenv("SAVE_PATH", "save.bin")
+record_path = os.getenv("RECORD_PATH", "")  # records the inputs of the game into the file if set
+
+event_log_level = os.getenv("EVENT_LOG_LEVEL", "INFO")
+event_log_size = int(os.getenv("EVENT_LOG_SIZE", "1000"))
+
+is_profiler = os.getenv("PROFILER", "0") == "1"
+profiler_path = os.getenv("PROFILER_PATH", "profile.json")
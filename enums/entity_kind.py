@@ -0,0 +1,7 @@
+from enum import IntEnum, auto
+
+
+class EntityKind(IntEnum):
+    CHARACTER = auto()
+    OBSTACLE = auto()
+    CREATURE = auto()
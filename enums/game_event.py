@@ -0,0 +1,9 @@
+from enum import IntEnum, auto
+
+
+class GameEvent(IntEnum):
+    MOVED = auto()
+    HIT = auto()
+    KILLED = auto()
+    DAMAGED = auto()
+    LEVEL_COMPLETE = auto()
@@ -0,0 +1,7 @@
+from enum import Enum, auto
+
+
+class GameStatus(Enum):
+    PLAYING = auto()
+    COMPLETE = auto()
+    DEAD = auto()
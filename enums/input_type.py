@@ -0,0 +1,8 @@
+from enum import IntEnum, auto
+
+
+class InputType(IntEnum):
+    LEVEL = auto()
+    MOVE = auto()
+    USE_TOOL = auto()
+    SELECT_TOOL = auto()
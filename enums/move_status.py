@@ -0,0 +1,8 @@
+from enum import Enum, auto
+
+
+class MoveStatus(Enum):
+    MOVED = auto()
+    WAITING = auto()
+    ARRIVED = auto()
+    EXIT = auto()
@@ -14,6 +14,8 @@ __status__ = "Development"
 
 import os
 
+from services.performance_service.startup_timer import StartupTimer  # should be imported first to time the startup
+
 os.environ["KIVY_AUDIO"] = "sdl2"  # should be configured before importing Kivy
 
 from kivy.config import Config
@@ -28,6 +30,7 @@ from kivy.core.window import Window
 from kivy.core.audio import SoundLoader
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
+from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.uix.splitter import Splitter
@@ -38,15 +41,29 @@ from enums.item_type import ItemType
 from pages.game_page.game_be import GameBE
 from pages.menu_page.menu_be import MenuBE
 from pages.splash_page.splash_be import SplashBE
+from services.interaction_service.game_loop import GameLoop
+from services.logging_service.event_log import EventLog
+from services.performance_service.profiler import Profiler
+from services.simulation_service.mine_simulation import MineSimulation
+
+StartupTimer.mark("import")
 
 
 class SplashScreen(Screen):
-    splash_screen = SplashBE()
-    splash_screen.load_design()
+    splash_screen = None
+
+    def __init__(self, **kwargs):
+        if SplashScreen.splash_screen is None:
+            SplashScreen.splash_screen = SplashBE()
+            SplashScreen.splash_screen.load_design()  # should be loaded before the rules are applied to the screen
+
+            StartupTimer.mark("splash design")
+
+        super().__init__(**kwargs)
 
     @staticmethod
     def skip(*args):
-        screen.switch_to(initial_screens[1])
+        screen.switch_to(MenuScreen(name=MenuScreen.__class__.__name__))
 
     def on_enter(self, *args):
         Clock.schedule_once(self.skip, 3)
@@ -56,11 +73,17 @@ class SplashScreen(Screen):
 
 
 class MenuScreen(Screen):
-    menu_screen = MenuBE()
-    menu_screen.load_design()
+    menu_screen = None
 
     sound_track = None
 
+    def __init__(self, **kwargs):
+        if MenuScreen.menu_screen is None:
+            MenuScreen.menu_screen = MenuBE()
+            MenuScreen.menu_screen.load_design()  # should be loaded before the rules are applied to the screen
+
+        super().__init__(**kwargs)
+
     def on_enter(self, *args):
         self.sound_track = SoundLoader.load(settings.app_track)
         if self.sound_track:
@@ -109,14 +132,33 @@ class MenuScreen(Screen):
 
 
 class GameScreen(Screen):
-    game_screen = GameBE()
-    game_screen.load_design()
+    game_screen = None
 
-    touch_x, touch_y = None, None
+    game_loop, frame_event = None, None
+    profiler_label, profiler_event = None, None
+    is_resumed = False
+
+    def __init__(self, **kwargs):
+        if GameScreen.game_screen is None:
+            GameScreen.game_screen = GameBE()
+            GameScreen.game_screen.load_design()  # should be loaded before the rules are applied to the screen
+
+        super().__init__(**kwargs)
 
     def on_pre_enter(self, *args):
+        if self.game_loop is None:
+            self.game_loop = GameLoop(MineSimulation.tick_duration)
+            self.game_loop.add_task("move", self.on_move, is_active=False)
+            self.game_loop.add_task("relocate", self.on_relocate, period=MineSimulation.relocate_ticks)
+            self.game_loop.add_task("danger", self.on_danger, period=MineSimulation.danger_ticks)
+            self.game_screen.start_recording(self.game_loop)
+
+            self.is_resumed = self.game_screen.resume_game()
+            if self.is_resumed:
+                Cache.append("game", "level", self.game_screen.simulation.level)
+
         current_level = Cache.get("game", "level", default=1)
-        self.game_screen.initialize_map(self.canvas, current_level)
+        self.game_screen.initialize_map(self.canvas, current_level, is_resumed=self.is_resumed)
 
     def on_enter(self, **kwargs):
         is_restart = kwargs.get("is_restart", True)
@@ -124,27 +166,67 @@ class GameScreen(Screen):
         if is_restart:
             item_pickaxe = self.ids.item_pickaxe
             item_sword = self.ids.item_sword
-            self.game_screen.select_tool(item_pickaxe, item_sword, ItemType.BASIC_PICKAXE)
-        else:
-            current_level += 1
+            if self.is_resumed and self.game_screen.simulation.action_generator.active_item == ItemType.BASIC_SWORD:
+                self.game_screen.select_tool(item_sword, item_pickaxe, ItemType.BASIC_SWORD)
+            else:
+                self.game_screen.select_tool(item_pickaxe, item_sword, ItemType.BASIC_PICKAXE)
 
         label_level = self.ids.label_level
         self.game_screen.mine_generator.draw_level(label_level, current_level)
 
         label_health = self.ids.label_health
-        self.game_screen.mine_generator.draw_health(label_health, 100)
-
-        Cache.append("game", "level", current_level)
-        Clock.schedule_interval(self.on_danger, 1)
-        Clock.schedule_interval(self.on_relocate, 0.1)
-
+        simulation = self.game_screen.simulation
+        current_health = simulation.entities.get_health(simulation.character_id)
+        self.game_screen.mine_generator.draw_health(label_health, current_health)
+
+        self.is_resumed = False
+        if self.frame_event is None:
+            self.frame_event = Clock.schedule_interval(self.on_frame, 0)
+        if Profiler.is_enabled and self.profiler_event is None:
+            self.on_profile()
+            self.profiler_event = Clock.schedule_interval(self.on_profile, 1)
+        self.game_loop.resume()
+
+    def on_leave(self, *args):
+        if self.frame_event is not None:
+            self.frame_event.cancel()
+            self.frame_event = None
+        if self.profiler_event is not None:
+            self.profiler_event.cancel()
+            self.profiler_event = None
+
+    @Profiler.timed("GameScreen.on_frame")
+    def on_frame(self, dt):
+        self.game_loop.advance(dt)
+        self.game_screen.dispatch_events(self)
+
+    def on_profile(self, *args):
+        if self.profiler_label is None:
+            self.profiler_label = Label(
+                font_name="RobotoMono-Regular",
+                font_size="10sp",
+                halign="left",
+                valign="top",
+                color=(1, 1, 1, .8),
+                size_hint=(None, None),
+                size=(Window.width / 2, Window.height / 2),
+                pos=(0, Window.height / 2)
+            )
+            self.profiler_label.bind(size=self.profiler_label.setter("text_size"))
+            self.add_widget(self.profiler_label)
+
+        self.profiler_label.text = Profiler.summary()
+
+    @Profiler.timed("GameScreen.on_move")
     def on_move(self, *args):
-        self.game_screen.update_character_position(self, self.touch_x, self.touch_y)
+        if not self.game_screen.update_character_position(self):
+            self.game_loop.set_active("move", False)  # the route is finished, a new tap starts another one
 
+    @Profiler.timed("GameScreen.on_danger")
     def on_danger(self, *args):
-        label_health = self.ids.label_health
-        self.game_screen.get_damage(self, self.canvas, label_health)
+        self.game_screen.get_damage(self)
 
+    @Profiler.timed("GameScreen.on_relocate")
     def on_relocate(self, *args):
         self.game_screen.update_creature_position()
 
@@ -161,43 +243,35 @@ class GameScreen(Screen):
             self.game_screen.select_tool(item_sword, item_pickaxe, ItemType.BASIC_SWORD)
         else:
             if not touch.is_double_tap:
-                self.touch_x, self.touch_y = touch.x, touch.y
-
-                Clock.schedule_interval(self.on_move, 0.05)
+                if self.game_screen.set_target(touch.x, touch.y):
+                    self.game_loop.set_active("move", True)
             else:
-                self.game_screen.use_tool(self.canvas)
+                self.game_loop.set_active("move", False)
+                self.game_screen.use_tool()
 
     def on_touch_move(self, touch):
-        self.touch_x, self.touch_y = touch.x, touch.y
-
-    def on_touch_up(self, touch):
-        Clock.unschedule(self.on_move)
+        self.game_screen.set_target(touch.x, touch.y)
 
     def on_pause(self):
-        Clock.unschedule(self.on_move)
-        Clock.unschedule(self.on_danger)
-        Clock.unschedule(self.on_relocate)
+        self.game_loop.set_active("move", False)
+        self.game_loop.pause()
 
-    def on_complete(self):
-        self.on_pause()
-        self.game_screen.select_menu(self, is_exit=True)
+    def on_resume(self, *args):
+        self.game_loop.resume()
 
     def on_next(self, *args):
-        self.canvas.after.clear()
+        is_restart = args[0] if len(args) > 0 else False
+        if not is_restart:
+            Cache.append("game", "level", Cache.get("game", "level", default=1) + 1)  # before the map is built
+
         self.on_pre_enter()
-        self.on_enter(is_restart=args[0] if len(args) > 0 else False)
+        self.on_enter(is_restart=is_restart)
 
     def on_quit(self, *args):
         self.game_screen.stop_app()
 
 
-initial_screens = [
-    SplashScreen(name=SplashScreen.__class__.__name__),
-    MenuScreen(name=MenuScreen.__class__.__name__),
-]
-
 screen = ScreenManager(transition=FadeTransition())
-screen.add_widget(initial_screens[0])
 
 Cache.register("game", limit=1)
 
@@ -212,9 +286,29 @@ class TreasureMineApp(App):
         Window.fullscreen = False
 
     def build(self):
+        screen.add_widget(SplashScreen(name=SplashScreen.__class__.__name__))
         screen.current = SplashScreen.__class__.__name__
+
+        StartupTimer.mark("build")
         return screen
 
+    def on_start(self):
+        Clock.schedule_once(self.on_first_frame)
+
+    @staticmethod
+    def on_first_frame(*args):
+        StartupTimer.mark("first frame")
+        if settings.is_startup_report:
+            StartupTimer.report()
+
+    def on_stop(self):
+        if GameScreen.game_screen is not None:
+            GameScreen.game_screen.stop_recording()
+            GameScreen.game_screen.save_game()
+        if Profiler.is_enabled:
+            Profiler.export(settings.profiler_path)
+
 
 if __name__ == "__main__":
+    EventLog.install_crash_hook()
     TreasureMineApp().run()
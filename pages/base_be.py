@@ -6,14 +6,20 @@ from kivy.uix.screenmanager import ScreenManager
 
 
 class BaseBE:
+    loaded_designs = set()
+
     @staticmethod
     def load_design(name: str) -> None:
         """
-        Loads page design by reading screen's frontend configuration file.
+        Loads page design by reading screen's frontend configuration file, only once per process.
         :param name: Screen name.
         :return:
         """
 
+        if name in BaseBE.loaded_designs:
+            return
+        BaseBE.loaded_designs.add(name)
+
         folder_name = "_page".join(name.lower().rsplit("be", 1))
         file_name = "_fe".join(name.lower().rsplit("be", 1))
         with open(f"pages/{folder_name}/{file_name}.kv", "r") as file:
@@ -1,10 +1,22 @@
+import math
+
 from kivy.graphics import Canvas
 
-from enums.item_class import ItemClass
+from configs import settings
+from enums.game_event import GameEvent
+from enums.game_status import GameStatus
+from enums.input_type import InputType
 from enums.item_type import ItemType
+from enums.move_status import MoveStatus
 from pages.base_be import BaseBE
 from services.graphic_service.mine_generator import MineGenerator
-from services.interaction_service.action_generator import ActionGenerator
+from services.interaction_service.event_bus import EventBus
+from services.interaction_service.game_loop import GameLoop
+from services.interaction_service.input_recorder import InputRecorder
+from services.performance_service.profiler import Profiler
+from services.simulation_service.level_pregenerator import LevelPregenerator
+from services.simulation_service.mine_simulation import MineSimulation
+from services.simulation_service.mine_snapshot import MineSnapshot
 
 
 class GameBE(BaseBE):
@@ -13,77 +25,158 @@ class GameBE(BaseBE):
 
     def __init__(self):
         self.mine_generator = MineGenerator()
-        self.action_generator = ActionGenerator()
-
-    def initialize_map(self, canvas: Canvas, level: int) -> None:
-        self.mine_generator.initialize_objects(level)
+        object_scale = settings.map_scale ** 2  # keeps the object density of a single screen
+        self.simulation = MineSimulation(*self.mine_generator.get_map_tiles(), object_scale=object_scale)
+        self.level_pregenerator = LevelPregenerator(*self.mine_generator.get_map_tiles(), object_scale=object_scale)
+        self.input_recorder, self.target = None, None
+
+        self.event_bus = EventBus(droppable_events=(GameEvent.MOVED, GameEvent.HIT))
+        self.event_bus.subscribe(GameEvent.MOVED, self.on_moved)
+        self.event_bus.subscribe(GameEvent.HIT, self.on_hit)
+        self.event_bus.subscribe(GameEvent.KILLED, self.on_killed)
+        self.event_bus.subscribe(GameEvent.DAMAGED, self.on_damaged)
+        self.event_bus.subscribe(GameEvent.LEVEL_COMPLETE, self.on_level_complete)
+
+    def start_recording(self, game_loop: GameLoop) -> None:
+        if settings.record_path and self.input_recorder is None:
+            self.input_recorder = InputRecorder(
+                lambda: game_loop.tick,
+                *self.mine_generator.get_map_tiles(),
+                self.simulation.object_scale,
+                settings.is_endless
+            )
+
+    def stop_recording(self) -> None:
+        if self.input_recorder is not None and self.simulation.entities is not None:
+            self.input_recorder.save(settings.record_path, self.simulation.get_state_hash())
+
+    @Profiler.timed()
+    def resume_game(self) -> bool:
+        if settings.is_endless:
+            return False
+
+        simulation = MineSnapshot.load(settings.save_path)
+        if simulation is None or (simulation.columns, simulation.rows) != self.mine_generator.get_map_tiles():
+            return False  # a mine saved on a different screen size does not fit the map
+
+        self.simulation = simulation
+        return True
+
+    @Profiler.timed()
+    def save_game(self) -> None:
+        if self.simulation.entities is None or self.simulation.chunk_streamer is not None:
+            return
+
+        if self.simulation.status == GameStatus.PLAYING:
+            MineSnapshot.save(self.simulation, settings.save_path)
+        else:
+            MineSnapshot.discard(settings.save_path)
+
+    @Profiler.timed()
+    def initialize_map(self, canvas: Canvas, level: int, is_resumed: bool = False) -> None:
+        if settings.is_endless:
+            self.simulation.initialize_endless()
+        elif not is_resumed:
+            simulation = self.level_pregenerator.take(level)
+            if simulation is None:
+                self.simulation.initialize_objects(level)
+            else:
+                if self.simulation.action_generator.active_item is not None:
+                    simulation.select_item(self.simulation.action_generator.active_item)
+                self.simulation = simulation
+
+        self.event_bus.clear()  # events of the previous level have nothing left to draw on
+        self.simulation.attach(self.event_bus)
+
+        if self.input_recorder is not None and not is_resumed:
+            self.input_recorder.record_level(self.simulation.level, self.simulation.level_seed)
+
+        self.mine_generator.initialize_objects(self.simulation)
         self.mine_generator.draw_character(canvas)
         self.mine_generator.draw_obstacles(canvas)
         self.mine_generator.draw_creatures(canvas)
 
-    def update_character_position(self, root, touch_x: int, touch_y: int) -> None:
-        objects = self.mine_generator.objects
-        object_size = self.mine_generator.object_size
-        map_size = self.mine_generator.map_size
-        exit_coordinates = self.mine_generator.coordinates["exit"][0]
+        if not settings.is_endless:
+            random_generator = self.simulation.random
+            self.level_pregenerator.request(level + 1, random_generator.getrandbits(64))
+            self.level_pregenerator.request(level, random_generator.getrandbits(64))  # in case the level is retried
 
-        is_exit = self.action_generator.move_player(objects, touch_x, touch_y, object_size, map_size, exit_coordinates)
-        if is_exit:
-            root.on_complete()
+    def set_target(self, touch_x: int, touch_y: int) -> bool:
+        target = self.mine_generator.to_tile(touch_x, touch_y)
+        if target is None:
+            return False
 
-    def update_creature_position(self) -> None:
-        objects = self.mine_generator.objects
-        object_size = self.mine_generator.object_size
-        map_size = self.mine_generator.map_size
+        self.target = target
+        return True
 
-        self.action_generator.move_creature(objects, object_size, map_size)
+    @Profiler.timed()
+    def update_character_position(self, root) -> bool:
+        target_column, target_row = self.target
+
+        level = self.simulation.level
+        if self.input_recorder is not None:
+            self.input_recorder.record_move(math.floor(target_column), math.floor(target_row))
+
+        move_status = self.simulation.move_player(target_column, target_row)
+        self.mine_generator.draw_chunks()
+        if self.simulation.level != level:
+            self.mine_generator.draw_level(root.ids.label_level, self.simulation.level)
+        if move_status == MoveStatus.EXIT:
+            root.on_pause()  # the exit menu is drawn with the events of the frame
+        return move_status in (MoveStatus.MOVED, MoveStatus.WAITING)
+
+    @Profiler.timed()
+    def update_creature_position(self) -> None:
+        self.simulation.move_creatures()
 
+    @Profiler.timed()
     def select_menu(self, root, is_exit: bool = False) -> None:
         if is_exit:
             self.mine_generator.draw_exit_menu(root, is_dead=False)
         else:
             self.mine_generator.draw_popup_menu(root)
 
+    @Profiler.timed()
     def select_tool(self, new_item, old_item, item_type: ItemType) -> None:
-        current_item = self.action_generator.active_item
+        current_item = self.simulation.action_generator.active_item
 
         if new_item != current_item:
             self.mine_generator.draw_item_selection(new_item, old_item)
-            self.action_generator.active_item = item_type
-            self.action_generator.active_item_power = (item_type.low_bound, item_type.high_bound)
-
-    def use_tool(self, canvas: Canvas) -> None:
-        active_item = self.action_generator.active_item
-        active_item_power = self.action_generator.active_item_power
-
-        if active_item.value == ItemClass.PICKAXE:
-            self.apply_damage(canvas, active_item_power, is_pickaxe=True)
-        elif active_item.value == ItemClass.SWORD:
-            self.apply_damage(canvas, active_item_power, is_pickaxe=False)
-
-    def apply_damage(self, canvas: Canvas, tool_power: tuple, is_pickaxe: bool) -> None:
-        objects = self.mine_generator.objects
-        object_size = self.mine_generator.object_size
-        x, y = objects["character_main"]["character"].pos
-
-        hit_damages, removed_objects = self.action_generator.hit_object(
-            objects, x, y, object_size, tool_power, is_obstacle=is_pickaxe
-        )
-        if hit_damages:
-            self.mine_generator.draw_hit_damages(canvas, hit_damages, x, y, is_received=False)
-        if removed_objects:
-            self.mine_generator.remove_objects(canvas, removed_objects)
-
-    def get_damage(self, root, canvas: Canvas, health_bar) -> None:
-        objects = self.mine_generator.objects
-        object_size = self.mine_generator.object_size
-        x, y = objects["character_main"]["character"].pos
-        current_health = objects["character_main"]["health"]
-
-        hit_damages, new_health = self.action_generator.hit_by_creature(objects, x, y, object_size, current_health)
-        if hit_damages:
-            self.mine_generator.draw_hit_damages(canvas, hit_damages, x, y, is_received=True)
-        if current_health != new_health:
-            self.mine_generator.draw_health(health_bar, new_health)
-            if new_health <= 0:
-                self.mine_generator.draw_exit_menu(root, is_dead=True)
+            self.simulation.select_item(item_type)
+            if self.input_recorder is not None:
+                self.input_recorder.record_input(InputType.SELECT_TOOL, list(ItemType).index(item_type))
+
+    @Profiler.timed()
+    def use_tool(self) -> None:
+        if self.input_recorder is not None:
+            self.input_recorder.record_input(InputType.USE_TOOL)
+
+        self.simulation.use_tool()
+
+    @Profiler.timed()
+    def get_damage(self, root) -> None:
+        self.simulation.hit_by_creature()
+        if self.simulation.status == GameStatus.DEAD:
+            root.on_pause()  # the exit menu is drawn with the events of the frame
+
+    @Profiler.timed()
+    def dispatch_events(self, root) -> None:
+        self.event_bus.dispatch(root)
+
+    def on_moved(self, events: list, dropped: int, root) -> None:
+        self.mine_generator.draw_positions([entity_id for entity_id, _ in events], is_synced=dropped > 0)
+
+    def on_hit(self, events: list, dropped: int, root) -> None:
+        character_id = self.simulation.character_id
+        x, y = self.mine_generator.to_position(*self.simulation.entities.get_position(character_id))
+        for is_received, hit_damages in events:
+            self.mine_generator.draw_hit_damages(hit_damages, x, y, is_received=is_received)
+
+    def on_killed(self, events: list, dropped: int, root) -> None:
+        self.mine_generator.remove_objects([entity_id for entity_id, _ in events])
+
+    def on_damaged(self, events: list, dropped: int, root) -> None:
+        self.mine_generator.draw_health(root.ids.label_health, events[-1][1])
+
+    def on_level_complete(self, events: list, dropped: int, root) -> None:
+        self.mine_generator.draw_exit_menu(root, is_dead=events[-1][1])
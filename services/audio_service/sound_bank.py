@@ -0,0 +1,68 @@
+from kivy import Logger
+from kivy.clock import Clock
+from kivy.core.audio import SoundLoader
+
+from services.performance_service.profiler import Profiler
+
+
+class SoundBank:
+    voice_amounts = {"hit_object": 3, "hit_damage": 3, "hit_remove": 3, "game_fail": 1, "game_success": 1}
+    voices, cursors, played_frames = {}, {}, {}
+
+    @staticmethod
+    def _load_sound(filename: str):
+        """
+        Loads the sound file to play on screen.
+        :param filename: Sound file name.
+        :return: Kivy sound.
+        """
+
+        prefix = "static/sounds/"
+        suffix = ".wav"
+
+        return SoundLoader.load(prefix + filename + suffix)
+
+    @classmethod
+    def preload(cls) -> None:
+        """
+        Decodes every effect once into a pool of voices, so the same effect can overlap itself.
+        :return:
+        """
+
+        for effect, voice_amount in cls.voice_amounts.items():
+            cls.voices[effect] = [i for i in (cls._load_sound(effect) for _ in range(voice_amount)) if i]
+            cls.cursors[effect] = 0
+
+        Logger.info(f'Sound Bank: Preload {sum(len(i) for i in cls.voices.values())} voices')
+
+    @classmethod
+    def play(cls, effect: str) -> bool:
+        """
+        Plays the effect on an idle voice, or on the oldest one if all are busy. The same effect is played once per
+        frame at most.
+        :param effect: Effect name.
+        :return: True if played, False if merged into an earlier call or not loaded.
+        """
+
+        if not cls.voices:
+            cls.preload()
+
+        if cls.played_frames.get(effect) == Clock.frames:
+            return False
+        cls.played_frames[effect] = Clock.frames
+
+        voices = cls.voices.get(effect)
+        if not voices:
+            return False
+
+        for voice in voices:
+            if voice.state != "play":
+                break
+        else:
+            voice = voices[cls.cursors[effect]]
+            cls.cursors[effect] = (cls.cursors[effect] + 1) % len(voices)
+            voice.stop()
+
+        voice.play()
+        Profiler.count("sounds")
+        return True
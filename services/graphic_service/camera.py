@@ -0,0 +1,87 @@
+class Camera:
+    def __init__(self,
+                 view_columns: int,
+                 view_rows: int,
+                 map_columns: int,
+                 map_rows: int,
+                 margin: int = 2,
+                 is_endless: bool = False):
+        self.view_columns, self.view_rows = view_columns, view_rows
+        self.map_columns, self.map_rows = map_columns, map_rows
+        self.margin, self.is_endless = margin, is_endless
+        self.column, self.row = 0, 0
+
+    def _clamp(self, column: int, row: int) -> tuple:
+        """
+        Keeps the view inside the map, an endless map has no bottom.
+        :param column: First visible column.
+        :param row: First visible row.
+        :return: Column and row.
+        """
+
+        return (
+            min(max(column, 0), max(self.map_columns - self.view_columns, 0)),
+            min(row if self.is_endless else max(row, 0), max(self.map_rows - self.view_rows, 0))
+        )
+
+    def _move(self, column: int, row: int) -> bool:
+        """
+        Moves the view within the map.
+        :param column: First visible column.
+        :param row: First visible row.
+        :return: True if the view moved, False otherwise.
+        """
+
+        column, row = self._clamp(column, row)
+        is_moved = (column, row) != (self.column, self.row)
+        self.column, self.row = column, row
+        return is_moved
+
+    def focus(self, column: int, row: int) -> bool:
+        """
+        Centers the view on the tile, e.g. on the character when a level starts.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if the view moved, False otherwise.
+        """
+
+        return self._move(column - self.view_columns // 2, row - self.view_rows // 2)
+
+    def follow(self, column: int, row: int) -> bool:
+        """
+        Scrolls the view only when the tile leaves its inner area, so a step inside it costs nothing.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if the view moved, False otherwise.
+        """
+
+        zone_columns, zone_rows = self.view_columns // 4, self.view_rows // 4
+        next_column = min(max(self.column, column - (self.view_columns - 1 - zone_columns)), column - zone_columns)
+        next_row = min(max(self.row, row - (self.view_rows - 1 - zone_rows)), row - zone_rows)
+        return self._move(next_column, next_row)
+
+    def get_visible_tiles(self) -> tuple:
+        """
+        Returns the tiles in view, widened by the margin so sprites are ready before they scroll in.
+        :return: First column, first row, last column and last row, all inclusive.
+        """
+
+        return (
+            max(self.column - self.margin, 0),
+            self.row - self.margin if self.is_endless else max(self.row - self.margin, 0),
+            min(self.column + self.view_columns - 1 + self.margin, self.map_columns - 1),
+            min(self.row + self.view_rows - 1 + self.margin, self.map_rows - 1)
+        )
+
+    def is_visible(self, column: int, row: int) -> bool:
+        """
+        Determines whether the tile is in view or within the margin around it.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if visible, False otherwise.
+        """
+
+        return (
+            self.column - self.margin <= column < self.column + self.view_columns + self.margin
+            and self.row - self.margin <= row < self.row + self.view_rows + self.margin
+        )
@@ -1,20 +1,25 @@
-import math
-import random
 from functools import partial
 
-from kivy import Logger
 from kivy.animation import Animation
-from kivy.core.audio import SoundLoader
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
-from kivy.uix.label import Label
-from kivy.core.image import Image
-from kivy.core.window import Window
-from kivy.graphics import Canvas, Color, Rectangle, Line
+from kivy.graphics import Canvas, Color, Line
 from kivy.uix.popup import Popup
 from kivy.uix.splitter import Splitter
 from kivy.uix.image import Image as Pic
+from kivy.utils import get_color_from_hex
+
+from enums.entity_kind import EntityKind
+from configs import settings
+from services.audio_service.sound_bank import SoundBank
+from services.graphic_service.camera import Camera
+from services.graphic_service.scene_graph import SceneGraph
+from services.graphic_service.texture_cache import TextureCache
+from services.graphic_service.widget_pool import WidgetPool
+from services.logging_service.event_log import EventLog
+from services.performance_service.profiler import Profiler
+from services.simulation_service.mine_simulation import MineSimulation
 
 
 class ImageButton(ButtonBehavior, Pic):
@@ -23,80 +28,100 @@ class ImageButton(ButtonBehavior, Pic):
 
 
 class MineGenerator:
-    max_width, max_height = Window.width, Window.height
-    map_size = max_width, max_height * 0.9
-    tile_amount = 20
-    object_size = min(map_size) // tile_amount
-    objects, coordinates, level_multiplier, max_level_multiplier = None, None, None, 7
+    map_size, object_size, simulation, scene, camera = None, None, None, None, None
+    chunk_revision = None
+    damage_pool, smoke_pool, water_pool = None, None, None
+
+    def __init__(self):
+        from kivy.core.window import Window  # creates the window, so it is deferred until the renderer is built
+
+        max_width, max_height = Window.width, Window.height
+        self.map_size = max_width, max_height * 0.9
+        self.object_size = min(self.map_size) // MineSimulation.tile_amount
+
+        SoundBank.preload()
+
+        view_columns, view_rows = int(self.map_size[0] // self.object_size), int(self.map_size[1] // self.object_size)
+        self.camera = Camera(
+            view_columns,
+            view_rows,
+            view_columns * settings.map_scale,
+            view_rows * settings.map_scale,
+            is_endless=settings.is_endless
+        )
+        self.scene = SceneGraph(self.to_position, self.object_size, self.map_size, self.camera)
+
+        self.damage_pool = WidgetPool(partial(self._create_effect, size=(self.object_size, self.object_size)))
+        self.smoke_pool = WidgetPool(
+            partial(
+                self._create_effect,
+                source="static/images/pic_smoke.png",
+                size=(self.object_size / 3, self.object_size / 3)
+            )
+        )
+        self.water_pool = WidgetPool(
+            partial(
+                self._create_effect,
+                source="static/images/pic_water.png",
+                size=(self.object_size / 3, self.object_size / 3)
+            )
+        )
 
-    def _generate_x_y(self) -> tuple:
+    def get_map_tiles(self) -> tuple:
+        """
+        Returns the number of tiles in the map, which is larger than the screen when the map is scaled.
+        :return: Number of columns and rows.
         """
-        Creates random coordinates.
+
+        return self.camera.map_columns, self.camera.map_rows
+
+    def to_position(self, column: int, row: int) -> tuple:
+        """
+        Converts tile coordinates into map coordinates, which the scene scrolls onto the screen.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
         :return: X and y coordinates.
         """
 
-        x = random.randint(1, self.map_size[0] // self.object_size - 1) * self.object_size
-        y = random.randint(1, self.map_size[1] // self.object_size - 1) * self.object_size
-        return int(x), int(y)
+        return int(column * self.object_size), int(row * self.object_size)
 
-    def _check_x_y(self, x: int, y: int) -> bool:
+    def to_tile(self, x: float, y: float):
         """
-        Determines whether the coordinates are occupied.
+        Converts screen coordinates into fractional tile coordinates of the map, taking the scrolling into account.
         :param x: X coordinate.
         :param y: Y coordinate.
-        :return: True if occupied, False otherwise.
+        :return: Column and row, None if the coordinates are outside the map on screen, e.g. on the top bar.
         """
 
-        occupied_tiles = []
-        for i in list(self.coordinates.values()):
-            occupied_tiles.extend(i)
-        return (x, y) in occupied_tiles
+        if not (0 <= x < self.map_size[0] and 0 <= y < self.map_size[1]):
+            return None
+        return x / self.object_size + self.camera.column, y / self.object_size + self.camera.row
 
-    @staticmethod
-    def _load_image(filename: str, random_range: int = None, is_png: bool = True):
+    def _create_effect(self, **kwargs):
         """
-        Loads the image file to create visual element on screen.
-        :param filename: Image file name.
-        :param random_range: Range for random suffix.
-        :param is_png: True for png, False for gif.
+        Creates a pooled effect widget on the effects layer of the scene.
+        :param kwargs: Kivy image properties.
         :return: Kivy image.
         """
 
-        prefix = "static/images/"
-
-        if is_png:
-            suffix = ".png"
-        else:
-            suffix = ".gif"
-
-        if random_range is not None:
-            suffix = f"_{str(random.randint(1, random_range))}" + suffix
-
-        return Image(prefix + filename + suffix)
+        pic_effect = Pic(**kwargs)
+        self.scene.add_effect(pic_effect)
+        return pic_effect
 
-    @staticmethod
-    def _load_sound(filename: str):
+    def _create_character(self):
         """
-        Loads the sound file to play on screen.
-        :param filename: Sound file name.
-        :return: Kivy sound.
+        Creates the animated character widget.
+        :return: Kivy image.
         """
 
-        prefix = "static/sounds/"
-        suffix = ".wav"
+        return Pic(source="static/images/object_character.gif", size=(self.object_size, self.object_size))
 
-        return SoundLoader.load(prefix + filename + suffix)
-
-    def initialize_objects(self, level: int):
-        self.objects = {}
-        self.coordinates = {
-            "character": [],
-            "obstacles": [],
-            "creatures": [],
-            "exit": []
-        }
-        self.level_multiplier = level  # TODO: int(math.log(level + 1, 2))
+    def initialize_objects(self, simulation: MineSimulation) -> None:
+        self.simulation = simulation
+        self.scene.reset(simulation.entities, simulation.grid)
+        self.chunk_revision = None
 
+    @Profiler.timed()
     def draw_exit_menu(self, root, is_dead: bool) -> None:
         """
         Creates visual element on screen for the exit menu.
@@ -109,7 +134,8 @@ class MineGenerator:
 
         layout_box = BoxLayout(orientation="vertical")
 
-        if self.level_multiplier != self.max_level_multiplier:
+        is_endless = self.simulation.chunk_streamer is not None  # an endless mine has no last level to win
+        if is_endless or self.simulation.level_multiplier != self.simulation.max_level_multiplier:
             if is_dead:
                 self.play_effect(effect="game_fail")
 
@@ -166,16 +192,19 @@ class MineGenerator:
         button_next.bind(on_press=menu_exit.dismiss)
         button_quit.bind(on_press=root.on_quit)
 
-        Logger.info('Mine Generator: Draw exit menu')
+        EventLog.info('Mine Generator', 'Draw exit menu')
 
     @staticmethod
+    @Profiler.timed()
     def draw_popup_menu(root) -> None:
         """
-        Creates visual element on screen for the pop-up menu.
+        Creates visual element on screen for the pop-up menu. The game is paused until the menu is dismissed.
         :param root: Kivy root.
         :return:
         """
 
+        root.on_pause()
+
         layout_box = BoxLayout(orientation="vertical")
 
         button_close = Button(
@@ -204,14 +233,16 @@ class MineGenerator:
             separator_color=(.5, .3, .1),
             background_color=(.5, .3, .1)
         )
+        menu_popup.bind(on_dismiss=root.on_resume)
         menu_popup.open()
 
         button_close.bind(on_press=menu_popup.dismiss)
         button_quit.bind(on_press=root.on_quit)
 
-        Logger.info('Mine Generator: Draw pop-up menu')
+        EventLog.info('Mine Generator', 'Draw pop-up menu')
 
     @staticmethod
+    @Profiler.timed()
     def draw_item_selection(new_item, old_item) -> None:
         """
         Creates visual element on screen for the selected item.
@@ -227,13 +258,14 @@ class MineGenerator:
         if old_item is not None:
             old_item.canvas.after.clear()
 
-        Logger.info('Mine Generator: Draw item selection')
+        EventLog.info('Mine Generator', 'Draw item selection')
 
     @staticmethod
+    @Profiler.timed()
     def draw_health(health_bar, health: int) -> None:
         """
         Creates visual element on screen for the health.
-        :param health_bar: Kivy label.
+        :param health_bar: Kivy image.
         :param health: Health of character.
         :return:
         """
@@ -245,35 +277,23 @@ class MineGenerator:
         else:
             font_color = "fa0e0e"
 
-        health_bar.text = f"[color={font_color}]{str(max(0, health))}[/color]"
+        health_bar.texture = TextureCache.get_text(str(max(0, health)), tuple(get_color_from_hex(font_color)))
 
+    @Profiler.timed()
     def draw_level(self, level_bar, level: int) -> None:
         """
         Creates visual element on screen for the level.
-        :param level_bar: Kivy label.
+        :param level_bar: Kivy image.
         :param level: Mine depth.
         :return:
         """
 
         font_colors = ["36e685", "f6d84b", "d58102", "cb650e", "be4818", "ae2a1e", "fa0e0e"]
-        font_color = font_colors[min(len(font_colors) - 1, self.level_multiplier - 1)]
-
-        level_bar.text = f"[color={font_color}]{str(level)}[/color]"
-
-    def create_character(self) -> None:
-        """
-        Assigns random coordinates for character to be placed on.
-        :return:
-        """
-
-        while True:
-            x, y = self._generate_x_y()
-            if not self._check_x_y(x, y):
-                self.coordinates["character"].append((x, y))
-                break
+        font_color = font_colors[min(len(font_colors) - 1, self.simulation.level_multiplier - 1)]
 
-        Logger.info(f'Mine Generator: Create character at {x}, {y}')
+        level_bar.texture = TextureCache.get_text(str(level), tuple(get_color_from_hex(font_color)))
 
+    @Profiler.timed()
     def draw_character(self, canvas: Canvas) -> None:
         """
         Creates visual element on screen for the character.
@@ -281,37 +301,15 @@ class MineGenerator:
         :return:
         """
 
-        self.create_character()
+        entities, character_id = self.simulation.entities, self.simulation.character_id
 
-        with canvas.after:
-            x, y = self.coordinates["character"][0]
-
-            object_character = Pic(
-                source="static/images/object_character.gif",
-                pos=(x, y),
-                size=(self.object_size, self.object_size)
-            )
-
-            self.objects["character_main"] = {"character": object_character, "health": 100}
-
-        Logger.info('Mine Generator: Draw character')
-
-    def create_obstacles(self) -> None:
-        """
-        Assigns random coordinates for obstacles to be placed on.
-        :return:
-        """
+        self.scene.attach(canvas)
+        self.scene.draw_character(self._create_character, *entities.get_position(character_id))
+        self.scene.follow(*entities.get_position(character_id), is_centered=True)
 
-        while True:
-            x, y = self._generate_x_y()
-            if not self._check_x_y(x, y):
-                self.coordinates["obstacles"].append((x, y))
-
-            if len(self.coordinates["obstacles"]) == (self.tile_amount // 2) + self.level_multiplier:
-                break
-
-        Logger.info(f'Mine Generator: Create {len(self.coordinates["obstacles"])} obstacles')
+        EventLog.debug('Mine Generator', 'Draw character')
 
+    @Profiler.timed()
     def draw_obstacles(self, canvas: Canvas) -> None:
         """
         Creates visual elements on screen for the obstacles.
@@ -319,78 +317,48 @@ class MineGenerator:
         :return:
         """
 
-        self.create_obstacles()
-
-        with canvas.after:
-            for i, (x, y) in enumerate(self.coordinates["obstacles"]):
-                if i == 0:
-                    Color(1, 1, 1)
-                    image_exit = self._load_image(filename="object_exit")
-                    _ = Rectangle(
-                        texture=image_exit.texture,
-                        pos=(x, y),
-                        size=(self.object_size, self.object_size)
-                    )
-
-                    self.coordinates["exit"].append((x, y))
-
-                Color(1, 1, 1)
-                image_obstacle = self._load_image(filename="object_obstacle", random_range=3)
-                object_obstacle = Rectangle(
-                    texture=image_obstacle.texture,
-                    pos=(x, y),
-                    size=(self.object_size, self.object_size)
-                )
+        self.scene.attach(canvas)
+        if self.simulation.exit_tile is not None:
+            self.scene.draw_exit(*self.simulation.exit_tile)
+        self.scene.sync(EntityKind.OBSTACLE)
+        self.scene.bake()
 
-                self.objects[f"obstacle_{x}_{y}"] = {"obstacle": object_obstacle, "health": 50 * self.level_multiplier}
+        EventLog.debug('Mine Generator', 'Draw obstacles')
 
-        Logger.info('Mine Generator: Draw obstacles')
-
-    def create_creatures(self) -> None:
+    @Profiler.timed()
+    def draw_creatures(self, canvas: Canvas) -> None:
         """
-        Assigns random coordinates for creatures to be placed on.
+        Creates visual elements on screen for the creatures.
+        :param canvas: Kivy canvas.
         :return:
         """
 
-        while True:
-            x, y = self._generate_x_y()
-            if not self._check_x_y(x, y):
-                self.coordinates["creatures"].append((x, y))
+        self.scene.attach(canvas)
+        self.scene.sync(EntityKind.CREATURE)
 
-            if len(self.coordinates["creatures"]) == (self.tile_amount // 3) + self.level_multiplier:
-                break
+        EventLog.debug('Mine Generator', 'Draw creatures')
 
-        Logger.info(f'Mine Generator: Create {len(self.coordinates["creatures"])} creatures')
-
-    def draw_creatures(self, canvas: Canvas) -> None:
+    @Profiler.timed()
+    def draw_chunks(self) -> None:
         """
-        Creates visual elements on screen for the creatures.
-        :param canvas: Kivy canvas.
+        Brings the visual elements in line with the chunks of an endless mine after they are streamed in or out.
         :return:
         """
 
-        self.create_creatures()
+        chunk_streamer = self.simulation.chunk_streamer
+        if chunk_streamer is None or chunk_streamer.revision == self.chunk_revision:
+            return
 
-        with canvas.after:
-            for x, y in self.coordinates["creatures"]:
-                Color(1, 1, 1)
-                image_creature = self._load_image(filename="object_creature", random_range=3)
-                object_creature = Rectangle(
-                    texture=image_creature.texture,
-                    pos=(x, y),
-                    size=(self.object_size, self.object_size)
-                )
+        self.chunk_revision = chunk_streamer.revision
+        self.scene.sync(EntityKind.OBSTACLE)
+        self.scene.sync(EntityKind.CREATURE)
 
-                self.objects[f"creature_{x}_{y}"] = {"creature": object_creature,
-                                                     "health": 50 * self.level_multiplier,
-                                                     "power": (5 * self.level_multiplier, 15 * self.level_multiplier)}
+        EventLog.debug('Mine Generator', 'Draw chunks at revision %s', chunk_streamer.revision)
 
-        Logger.info('Mine Generator: Draw creatures')
-
-    def draw_hit_damages(self, canvas: Canvas, hit_damages: list, x: int, y: int, is_received: bool = True) -> None:
+    @Profiler.timed()
+    def draw_hit_damages(self, hit_damages: list, x: int, y: int, is_received: bool = True) -> None:
         """
         Creates visual elements on screen for the hit damages.
-        :param canvas: Kivy canvas.
         :param hit_damages: List of hit damages.
         :param x: X coordinate of character.
         :param y: Y coordinate of character.
@@ -398,35 +366,35 @@ class MineGenerator:
         :return:
         """
 
-        with canvas.after:
-            self.draw_effect(x=x, y=y, is_smoke=not is_received)
+        self.draw_effect(x=x, y=y, is_smoke=not is_received)
 
-            if is_received:
-                self.play_effect(effect="hit_damage")
+        if is_received:
+            self.play_effect(effect="hit_damage")
 
-                font_color = (1, 0, 0, 0.5)
-                y -= self.object_size
-                next_y = y - self.object_size
-            else:
-                self.play_effect(effect="hit_object")
+            font_color = (1, 0, 0, 0.5)
+            y -= self.object_size
+            next_y = y - self.object_size
+        else:
+            self.play_effect(effect="hit_object")
 
-                font_color = (0, 1, 0, 0.5)
-                y += self.object_size
-                next_y = y + self.object_size
+            font_color = (0, 1, 0, 0.5)
+            y += self.object_size
+            next_y = y + self.object_size
 
-            for i in hit_damages:
-                label = Label(
-                    text=str(i),
-                    pos=(x, y),
-                    size=(self.object_size, self.object_size),
-                    color=font_color
-                )
+        for i in hit_damages:
+            label = self.damage_pool.acquire()
+            label.texture = TextureCache.get_text(str(i), font_color)
+            label.pos = x, y
+            label.opacity = 1
 
-                fade_animation = Animation(y=next_y, opacity=0, duration=1)
-                fade_animation.start(label)
+            fade_animation = Animation(y=next_y, opacity=0, duration=1)
+            fade_animation.bind(on_complete=lambda _, widget: self.damage_pool.release(widget))
+            fade_animation.start(label)
+            Profiler.count("animations")
 
-        Logger.info('Mine Generator: Draw hit damages')
+        EventLog.debug('Mine Generator', 'Draw %s hit damages', len(hit_damages))
 
+    @Profiler.timed()
     def draw_effect(self, x: int, y: int, is_smoke: bool = True) -> None:
         """
         Creates visual element on screen for action effect.
@@ -437,23 +405,24 @@ class MineGenerator:
         """
 
         if is_smoke:
-            source = "static/images/pic_smoke.png"
+            effect_pool = self.smoke_pool
             next_y = y + (self.object_size * 2 / 3)
             y += self.object_size / 3
         else:
-            source = "static/images/pic_water.png"
+            effect_pool = self.water_pool
             next_y = y + (self.object_size / 3)
             y += self.object_size * 2 / 3
 
-        pic_effect = Pic(
-            source=source,
-            pos=(x + self.object_size / 3, y),
-            size=(self.object_size / 3, self.object_size / 3)
-        )
+        pic_effect = effect_pool.acquire()
+        pic_effect.pos = x + self.object_size / 3, y
+        pic_effect.opacity = 1
+
         fade_animation = Animation(y=next_y, opacity=0, duration=0.5)
+        fade_animation.bind(on_complete=lambda _, widget: effect_pool.release(widget))
         fade_animation.start(pic_effect)
+        Profiler.count("animations")
 
-        Logger.info('Mine Generator: Draw effect')
+        EventLog.debug('Mine Generator', 'Draw effect')
 
     def play_effect(self, effect: str) -> None:
         """
@@ -462,25 +431,56 @@ class MineGenerator:
         :return:
         """
 
-        sound_effect = self._load_sound(filename=effect)
-        if sound_effect:
-            sound_effect.play()
+        if SoundBank.play(effect):
+            EventLog.debug('Mine Generator', 'Play effect %s', effect)
+
+    @Profiler.timed()
+    def draw_position(self, entity_id: int) -> None:
+        """
+        Moves the visual element of the entity onto its current tile.
+        :param entity_id: Entity id.
+        :return:
+        """
+
+        column, row = self.simulation.entities.get_position(entity_id)
+        if entity_id == self.simulation.character_id:
+            self.scene.draw_character(self._create_character, column, row)
+            self.scene.follow(column, row)
+        else:
+            self.scene.update(entity_id, column, row)
+
+    @Profiler.timed()
+    def draw_positions(self, entity_ids: list, is_synced: bool = False) -> None:
+        """
+        Moves the visual elements of the entities moved within a frame, each once however many ticks it moved.
+        :param entity_ids: List of entity ids.
+        :param is_synced: True to bring all creatures in line, e.g. when some of the moves were dropped.
+        :return:
+        """
+
+        character_id = self.simulation.character_id
+        if is_synced:
+            self.scene.sync(EntityKind.CREATURE)
+            self.draw_position(character_id)
+        else:
+            for i in entity_ids:
+                if self.simulation.entities.is_alive(i):
+                    self.draw_position(i)
 
-            Logger.info('Mine Generator: Play effect')
+        EventLog.debug('Mine Generator', 'Draw %s positions', len(entity_ids))
 
-    def remove_objects(self, canvas: Canvas, removed_objects: list) -> None:
+    @Profiler.timed()
+    def remove_objects(self, removed_objects: list) -> None:
         """
         Deletes the visual elements of the objects from screen.
-        :param canvas: Kivy canvas.
-        :param removed_objects: List of visual elements.
+        :param removed_objects: List of entity ids.
         :return:
         """
 
         for i in removed_objects:
-            with canvas.after:
-                self.draw_effect(x=i.pos[0], y=i.pos[1])
-                self.play_effect(effect="hit_remove")
-
-            canvas.after.remove(i)
+            position = self.scene.remove(i)
+            if position is not None:
+                self.draw_effect(x=position[0], y=position[1])
+        self.play_effect(effect="hit_remove")
 
-        Logger.info(f'Mine Generator: Remove {len(removed_objects)} objects')
+        EventLog.debug('Mine Generator', 'Remove %s objects', len(removed_objects))
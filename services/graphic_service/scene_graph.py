@@ -0,0 +1,304 @@
+from typing import Callable
+
+from kivy.graphics import (
+    Canvas, ClearBuffers, ClearColor, Color, Fbo, InstructionGroup, PopMatrix, PushMatrix, Rectangle, Translate
+)
+from kivy.graphics.scissor_instructions import ScissorPop, ScissorPush
+
+from configs import settings
+from enums.entity_kind import EntityKind
+from services.graphic_service.camera import Camera
+from services.graphic_service.texture_cache import TextureCache
+from services.simulation_service.entity_store import EntityStore
+from services.simulation_service.tile_grid import TileGrid
+
+
+class SceneGraph:
+    layer_names = ("terrain", "obstacles", "creatures", "character", "effects")
+    kind_layers = {EntityKind.OBSTACLE: "obstacles", EntityKind.CREATURE: "creatures"}
+    kind_filenames = {EntityKind.OBSTACLE: "object_obstacle", EntityKind.CREATURE: "object_creature"}
+    static_layer_names = ("terrain", "obstacles")
+
+    def __init__(self, to_position: Callable, object_size: int, view_size: tuple, camera: Camera):
+        self.to_position = to_position
+        self.object_size = object_size
+        self.camera = camera
+        self.canvas, self.exit_sprite, self.character_widget = None, None, None
+        self.entities, self.grid = None, None
+
+        self.layers = {}
+        for name in self.layer_names:
+            self.layers[name] = InstructionGroup()
+            self.layers[name].add(Color(1, 1, 1))
+
+        self.sprites, self.tiles = {}, {}
+        self.spare_sprites = {name: [] for name in self.kind_layers.values()}
+
+        self.static_fbo, self.static_scissor, self.static_sprite = None, None, None
+        world_layers = [self.layers[name] for name in self.layer_names]
+        if settings.is_static_cache:
+            world_layers = self._create_static_cache(
+                int(camera.map_columns * object_size), int(camera.map_rows * object_size)
+            )
+
+        # the world is drawn in map coordinates and scrolled by a single translation, clipped to the view
+        self.translation = Translate(0, 0)
+        self.canvas_layers = [
+            ScissorPush(x=0, y=0, width=int(view_size[0]), height=int(view_size[1])), PushMatrix(), self.translation
+        ] + world_layers + [PopMatrix(), ScissorPop()]
+
+    def _create_static_cache(self, width: int, height: int) -> list:
+        """
+        Moves the terrain and obstacle layers into an offscreen buffer, which is shown as a single rectangle and
+        rendered again only when the layers change. The whole map is baked, so the static layers are not culled.
+        :param width: Width of the map.
+        :param height: Height of the map.
+        :return: Layers to be drawn in map coordinates.
+        """
+
+        self.static_fbo = Fbo(size=(width, height))
+        self.static_scissor = ScissorPush(x=0, y=0, width=width, height=height)
+        self.static_fbo.add(self.static_scissor)
+        self.static_fbo.add(ClearColor(0, 0, 0, 0))
+        self.static_fbo.add(ClearBuffers())
+        for name in self.static_layer_names:
+            self.static_fbo.add(self.layers[name])
+        self.static_fbo.add(ScissorPop())
+        self.static_fbo.add_reload_observer(lambda *args: self.bake())
+
+        self.static_sprite = InstructionGroup()
+        self.static_sprite.add(Color(1, 1, 1))
+        self.static_sprite.add(Rectangle(texture=self.static_fbo.texture, size=(width, height)))
+
+        return [self.static_sprite] + [
+            self.layers[name] for name in self.layer_names if name not in self.static_layer_names
+        ]
+
+    def _render_static(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Renders the static layers again within the region, leaving the rest of the buffer as it is.
+        :param x: X coordinate of the region.
+        :param y: Y coordinate of the region.
+        :param width: Width of the region.
+        :param height: Height of the region.
+        :return:
+        """
+
+        self.static_fbo.remove(self.static_scissor)
+        self.static_scissor = ScissorPush(x=int(x), y=int(y), width=int(width), height=int(height))
+        self.static_fbo.insert(0, self.static_scissor)
+        self.static_fbo.draw()
+
+        if self.canvas is not None:
+            self.canvas.ask_update()
+
+    def _is_culled(self, kind: EntityKind) -> bool:
+        """
+        Determines whether sprites of the kind exist only around the view.
+        :param kind: Entity kind.
+        :return: True if culled, False if every entity of the kind has a sprite.
+        """
+
+        return self.static_fbo is None or self.kind_layers[kind] not in self.static_layer_names
+
+    def _get_shown_ids(self, kind: EntityKind) -> list:
+        """
+        Returns the entities of the kind to have a sprite. Culled ones are found through the tiles around the view,
+        so the cost follows the screen size rather than the map size.
+        :param kind: Entity kind.
+        :return: List of entity ids.
+        """
+
+        if not self._is_culled(kind):
+            return self.entities.ids(kind)
+
+        first_column, first_row, last_column, last_row = self.camera.get_visible_tiles()
+        shown_ids = []
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                occupant = self.grid.get(column, row)
+                if occupant is not None and self.entities.kind(occupant) == kind:
+                    shown_ids.append(occupant)
+        return shown_ids
+
+    def attach(self, canvas: Canvas) -> None:
+        """
+        Adds the layers to the canvas once, moving them over if they are still on the canvas of an earlier screen.
+        :param canvas: Kivy canvas.
+        :return:
+        """
+
+        if self.canvas is canvas:
+            return
+
+        for layer in self.canvas_layers:
+            if self.canvas is not None:
+                self.canvas.after.remove(layer)
+            canvas.after.add(layer)
+        self.canvas = canvas
+
+    def reset(self, entities: EntityStore, grid: TileGrid) -> None:
+        """
+        Hides every entity sprite of the previous level, keeping the instructions to be reused by the next one.
+        :param entities: Entity store of the next level.
+        :param grid: Occupancy index of the next level.
+        :return:
+        """
+
+        for entity_id in list(self.sprites):
+            self._hide(entity_id)
+        self.entities, self.grid = entities, grid
+
+    def bake(self) -> None:
+        """
+        Renders the whole static layer once the level is drawn, nothing happens if the cache is disabled.
+        :return:
+        """
+
+        if self.static_fbo is not None:
+            self._render_static(0, 0, *self.static_fbo.size)
+
+    def follow(self, column: int, row: int, is_centered: bool = False) -> None:
+        """
+        Scrolls the view along with the character. Scrolling moves the world by one translation and only brings the
+        sprites around the view in line with it.
+        :param column: Column of the character.
+        :param row: Row of the character.
+        :param is_centered: True to center the view on the character, False to scroll only near the view edges.
+        :return:
+        """
+
+        is_moved = self.camera.focus(column, row) if is_centered else self.camera.follow(column, row)
+        if is_moved:
+            self.translation.xy = -self.camera.column * self.object_size, -self.camera.row * self.object_size
+            for kind in self.kind_layers:
+                if self._is_culled(kind):
+                    self.sync(kind)
+
+    def draw_exit(self, column: int, row: int) -> None:
+        """
+        Places the exit on the terrain layer, under the obstacle hiding it.
+        :param column: Column of the exit.
+        :param row: Row of the exit.
+        :return:
+        """
+
+        if self.exit_sprite is None:
+            self.exit_sprite = Rectangle(
+                texture=TextureCache.get(filename="object_exit"), size=(self.object_size, self.object_size)
+            )
+            self.layers["terrain"].add(self.exit_sprite)
+        self.exit_sprite.pos = self.to_position(column, row)
+
+    def draw_character(self, widget_factory: Callable, column: int, row: int) -> None:
+        """
+        Places the character on its layer, creating the animated widget only once.
+        :param widget_factory: Function creating the character widget.
+        :param column: Column of the character.
+        :param row: Row of the character.
+        :return:
+        """
+
+        if self.character_widget is None:
+            self.character_widget = widget_factory()
+            self.layers["character"].add(self.character_widget.canvas)
+        self.character_widget.pos = self.to_position(column, row)
+
+    def add_effect(self, widget) -> None:
+        """
+        Places a pooled effect widget on the effects layer, where it stays while idle instead of being removed.
+        :param widget: Kivy widget.
+        :return:
+        """
+
+        self.layers["effects"].add(widget.canvas)
+
+    def sync(self, kind: EntityKind) -> None:
+        """
+        Brings the layer of the kind in line with the entity store: sprites of removed or culled entities are hidden,
+        new entities in view get a sprite and only the sprites whose tile changed are moved.
+        :param kind: Entity kind.
+        :return:
+        """
+
+        shown_ids = set(self._get_shown_ids(kind))
+        for entity_id, (sprite_kind, _) in list(self.sprites.items()):
+            if sprite_kind == kind and entity_id not in shown_ids:
+                self.remove(entity_id)
+
+        for entity_id in shown_ids:
+            self.update(entity_id, *self.entities.get_position(entity_id))
+
+    def add(self, entity_id: int, kind: EntityKind, variant: int, column: int, row: int) -> None:
+        """
+        Shows a sprite for the entity, reusing a hidden one of the layer if there is any.
+        :param entity_id: Entity id.
+        :param kind: Entity kind.
+        :param variant: Sprite variant.
+        :param column: Column of the entity.
+        :param row: Row of the entity.
+        :return:
+        """
+
+        texture = TextureCache.get(filename=self.kind_filenames[kind], variant=variant)
+        spare_sprites = self.spare_sprites[self.kind_layers[kind]]
+        if spare_sprites:
+            sprite = spare_sprites.pop()
+            sprite.texture = texture
+            sprite.size = self.object_size, self.object_size
+        else:
+            sprite = Rectangle(texture=texture, size=(self.object_size, self.object_size))
+            self.layers[self.kind_layers[kind]].add(sprite)
+
+        sprite.pos = self.to_position(column, row)
+        self.sprites[entity_id] = kind, sprite
+        self.tiles[entity_id] = column, row
+
+    def update(self, entity_id: int, column: int, row: int) -> None:
+        """
+        Moves the sprite of the entity, leaving its instructions untouched if the tile did not change. An entity
+        moving out of view loses its sprite and one moving into view gets one, other culled entities cost a check.
+        :param entity_id: Entity id.
+        :param column: Column of the entity.
+        :param row: Row of the entity.
+        :return:
+        """
+
+        kind = self.entities.kind(entity_id)
+        if self._is_culled(kind) and not self.camera.is_visible(column, row):
+            self.remove(entity_id)
+        elif entity_id not in self.sprites:
+            self.add(entity_id, kind, self.entities.get_variant(entity_id), column, row)
+        elif self.tiles[entity_id] != (column, row):
+            self.sprites[entity_id][1].pos = self.to_position(column, row)
+            self.tiles[entity_id] = column, row
+
+    def _hide(self, entity_id: int) -> tuple:
+        """
+        Collapses the sprite of the entity and keeps it for reuse, instead of searching the layer to remove it.
+        :param entity_id: Entity id.
+        :return: Entity kind and the x and y coordinates where the sprite was.
+        """
+
+        kind, sprite = self.sprites.pop(entity_id)
+        del self.tiles[entity_id]
+
+        x, y = sprite.pos
+        sprite.size = 0, 0
+        self.spare_sprites[self.kind_layers[kind]].append(sprite)
+        return kind, x, y
+
+    def remove(self, entity_id: int):
+        """
+        Hides the sprite of the entity. On a cached static layer only the tile of the sprite is rendered again.
+        :param entity_id: Entity id.
+        :return: X and y coordinates where the sprite was, None if the entity has no sprite.
+        """
+
+        if entity_id not in self.sprites:
+            return None
+
+        kind, x, y = self._hide(entity_id)
+        if self.static_fbo is not None and self.kind_layers[kind] in self.static_layer_names:
+            self._render_static(x, y, self.object_size, self.object_size)
+        return x, y
@@ -0,0 +1,87 @@
+from kivy import Logger
+from kivy.core.image import Image
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics.texture import Texture
+from kivy.metrics import sp
+
+
+class TextureCache:
+    atlas_sprites = (("object_exit", None), ) + tuple(
+        (filename, variant) for filename in ("object_obstacle", "object_creature") for variant in (1, 2, 3)
+    )
+    textures, text_textures, atlas = {}, {}, None
+
+    @staticmethod
+    def _get_path(filename: str, variant: int = None, is_png: bool = True) -> str:
+        """
+        Returns the image file path of the sprite.
+        :param filename: Image file name.
+        :param variant: Number suffix of the image file.
+        :param is_png: True for png, False for gif.
+        :return: Image file path.
+        """
+
+        suffix = ".png" if is_png else ".gif"
+        if variant is not None:
+            suffix = f"_{str(variant)}" + suffix
+
+        return "static/images/" + filename + suffix
+
+    @classmethod
+    def build_atlas(cls) -> None:
+        """
+        Packs the mine object sprites side by side into one texture and caches a region of it for each sprite.
+        :return:
+        """
+
+        images = [(key, Image(cls._get_path(*key))) for key in cls.atlas_sprites]
+
+        atlas = Texture.create(
+            size=(sum(image.width for _, image in images), max(image.height for _, image in images)),
+            colorfmt="rgba"
+        )
+
+        x = 0
+        for key, image in images:
+            atlas.blit_buffer(image.texture.pixels, pos=(x, 0), size=image.size, colorfmt="rgba", bufferfmt="ubyte")
+            cls.textures[key] = atlas.get_region(x, 0, image.width, image.height)
+            x += image.width
+
+        cls.atlas = atlas
+
+        Logger.info(f'Texture Cache: Build atlas of {len(images)} sprites ({atlas.width}x{atlas.height})')
+
+    @classmethod
+    def get(cls, filename: str, variant: int = None, is_png: bool = True):
+        """
+        Returns the texture of the sprite, loading it from disk only the first time it is requested.
+        :param filename: Image file name.
+        :param variant: Number suffix of the image file.
+        :param is_png: True for png, False for gif.
+        :return: Kivy texture.
+        """
+
+        if cls.atlas is None and (filename, variant) in cls.atlas_sprites:
+            cls.build_atlas()
+
+        key = (filename, variant)
+        if key not in cls.textures:
+            cls.textures[key] = Image(cls._get_path(filename, variant, is_png)).texture
+        return cls.textures[key]
+
+    @classmethod
+    def get_text(cls, text: str, color: tuple, font_size: float = 15):
+        """
+        Returns the texture of the text, rasterizing it only the first time it is requested.
+        :param text: Text to be rendered.
+        :param color: Font color.
+        :param font_size: Font size in scale-independent pixels.
+        :return: Kivy texture.
+        """
+
+        key = (text, color, font_size)
+        if key not in cls.text_textures:
+            label = CoreLabel(text=text, color=color, font_size=sp(font_size))
+            label.refresh()
+            cls.text_textures[key] = label.texture
+        return cls.text_textures[key]
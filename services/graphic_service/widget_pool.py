@@ -0,0 +1,34 @@
+from typing import Callable
+
+from services.performance_service.profiler import Profiler
+
+
+class WidgetPool:
+    def __init__(self, factory: Callable):
+        self.factory = factory
+        self.idle, self.busy = [], set()
+
+    def acquire(self):
+        """
+        Returns an idle widget, creating a new one only if every widget is busy.
+        :return: Kivy widget.
+        """
+
+        if self.idle:
+            widget = self.idle.pop()
+        else:
+            widget = self.factory()
+            Profiler.count("widgets")
+        self.busy.add(widget)
+        return widget
+
+    def release(self, widget, *args) -> None:
+        """
+        Marks the widget as idle to be reused, it can be bound to animation completion directly.
+        :param widget: Kivy widget.
+        :return:
+        """
+
+        if widget in self.busy:
+            self.busy.remove(widget)
+            self.idle.append(widget)
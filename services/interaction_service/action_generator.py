@@ -1,11 +1,22 @@
+import math
 import random
 
-from kivy import Logger
+from enums.entity_kind import EntityKind
+from enums.move_status import MoveStatus
+from services.interaction_service.combat_resolver import CombatResolver
+from services.interaction_service.path_finder import PathFinder
+from services.logging_service.event_log import EventLog
+from services.simulation_service.entity_store import EntityStore
+from services.simulation_service.tile_grid import TileGrid, neighbor_offsets
 
 
 class ActionGenerator:
     active_item, active_item_power = None, None
 
+    def __init__(self, random_generator: random.Random = None):
+        self.random = random_generator if random_generator is not None else random.Random()
+        self.combat_resolver = CombatResolver(self.random)
+
     @staticmethod
     def _check_exit(exit_coordinates: tuple, coordinates: tuple) -> bool:
         """
@@ -18,180 +29,213 @@ class ActionGenerator:
         return exit_coordinates == coordinates
 
     @staticmethod
-    def _check_inside_map(x: int, y: int, map_size: tuple) -> bool:
+    def _check_inside_map(column: float, row: float, grid: TileGrid) -> bool:
         """
         Determines whether the coordinates are inside the map.
-        :param x: X coordinate.
-        :param y: Y coordinate.
-        :param map_size: Maximum coordinates on screen.
+        :param column: Column, possibly fractional.
+        :param row: Row, possibly fractional.
+        :param grid: Occupancy index of the tiles.
         :return: True if inside, False otherwise.
         """
 
-        return 0 <= x < map_size[0] and 0 <= y < map_size[1]
+        return grid.is_inside(math.floor(column), math.floor(row))
 
     @staticmethod
-    def _check_collision(all_objects: dict, new_x: int, new_y: int, object_size: int) -> bool:
+    def _check_collision(grid: TileGrid, new_column: int, new_row: int) -> bool:
         """
         Determines whether new position of the character is occupied by any object.
-        :param all_objects: All objects on screen.
-        :param new_x: X coordinate for the character to be placed on.
-        :param new_y: Y coordinate for the character to be placed on.
-        :param object_size: Tile size.
+        :param grid: Occupancy index of the tiles.
+        :param new_column: Column for the character to be placed on.
+        :param new_row: Row for the character to be placed on.
         :return: True for collision, False otherwise.
         """
 
-        for i in list(all_objects.keys()):
-            x, y = int(float(i.split("_")[1])), int(float(i.split("_")[2]))
-            if abs(new_x - x) < object_size and abs(new_y - y) < object_size:
-                return True
-        return False
+        return not grid.is_free(new_column, new_row)
 
     @staticmethod
-    def _get_collided_objects(all_objects: dict, character_x: int, character_y: int, object_size: int) -> list:
+    def _get_collided_objects(entities: EntityStore,
+                              grid: TileGrid,
+                              character_column: int,
+                              character_row: int,
+                              kind: EntityKind) -> list:
         """
         Returns list of the objects that the coordinates collide with.
-        :param all_objects: All objects on screen.
-        :param character_x: X coordinate of character.
-        :param character_y: Y coordinate of character.
-        :param object_size: Tile size.
-        :return: List of object ids.
+        :param entities: All objects on screen.
+        :param grid: Occupancy index of the tiles.
+        :param character_column: Column of character.
+        :param character_row: Row of character.
+        :param kind: Entity kind, either obstacle or creature.
+        :return: List of entity ids.
         """
 
-        collided_objects = []
-        for i in list(all_objects.keys()):
-            x, y = int(float(i.split("_")[1])), int(float(i.split("_")[2]))
-            if abs(character_x - x) < object_size * 2 and abs(character_y - y) < object_size * 2:
-                collided_objects.append(i)
-        return collided_objects
+        return [i for i in grid.neighbors(character_column, character_row, radius=1) if entities.kind(i) == kind]
 
     def move_player(self,
-                    objects: dict,
-                    touch_x: int,
-                    touch_y: int,
-                    object_size: int,
-                    map_size: tuple,
-                    exit_coordinates: tuple) -> bool:
-        """
-        Positions visual element of the character into the new coordinates.
-        :param objects: All objects on screen.
-        :param touch_x: X coordinate of touch event.
-        :param touch_y: Y coordinate of touch event.
-        :param object_size: Tile size.
-        :param map_size: Maximum coordinates on screen.
-        :param exit_coordinates: Coordinates for the exit.
-        :return: True for exit, False otherwise.
-        """
-
-        if self._check_inside_map(touch_x, touch_y, map_size):
-            object_character = objects["character_main"]["character"]
-            x, y = object_character.pos
-            diff_x, diff_y = touch_x - x, touch_y - y
-            if abs(diff_x) > object_size:
-                x += ((diff_x > 0) - (diff_x < 0)) * object_size
-            if abs(diff_y) > object_size:
-                y += ((diff_y > 0) - (diff_y < 0)) * object_size
-
-            if self._check_inside_map(x, y, map_size):
-                all_objects = {k: v for k, v in objects.items() if "obstacle" in k or "creature" in k}
-                if not self._check_collision(all_objects, x, y, object_size):
-                    object_character.pos = x, y
-
-                    Logger.info(f'Action Generator: Move player to {x}, {y}')
-
-                    return self._check_exit(exit_coordinates, (x, y))
+                    entities: EntityStore,
+                    grid: TileGrid,
+                    path_finder: PathFinder,
+                    character_id: int,
+                    target_column: float,
+                    target_row: float,
+                    exit_coordinates: tuple) -> MoveStatus:
+        """
+        Moves the character one tile along the route to the target, waiting while a creature blocks the way.
+        :param entities: All objects on screen.
+        :param grid: Occupancy index of the tiles.
+        :param path_finder: Route cache of the map.
+        :param character_id: Entity id of the character.
+        :param target_column: Column of touch event, possibly fractional.
+        :param target_row: Row of touch event, possibly fractional.
+        :param exit_coordinates: Tile of the exit.
+        :return: Exit if the character steps on the exit, moved or waiting while the route goes on, arrived once
+        there is nothing left to walk.
+        """
+
+        if not self._check_inside_map(target_column, target_row, grid):
+            return MoveStatus.ARRIVED
+
+        character_tile = entities.get_position(character_id)
+        next_tile = path_finder.get_next_tile(character_tile, (math.floor(target_column), math.floor(target_row)))
+        if next_tile is None:
+            return MoveStatus.ARRIVED
+
+        column, row = next_tile
+        if self._check_collision(grid, column, row):
+            return MoveStatus.WAITING
+
+        entities.set_position(character_id, column, row)
+
+        EventLog.debug('Action Generator', 'Move player to %s, %s', column, row)
+
+        return MoveStatus.EXIT if self._check_exit(exit_coordinates, (column, row)) else MoveStatus.MOVED
+
+    def _relocate_creature(self,
+                           entities: EntityStore,
+                           grid: TileGrid,
+                           creature_id: int,
+                           creature_column: int,
+                           creature_row: int,
+                           candidates: list) -> bool:
+        """
+        Moves the creature onto the first free tile among the candidate offsets.
+        :param entities: All objects on screen.
+        :param grid: Occupancy index of the tiles.
+        :param creature_id: Entity id of the creature.
+        :param creature_column: Column of the creature.
+        :param creature_row: Row of the creature.
+        :param candidates: Offsets to be tried in order.
+        :return: True if moved, False if every candidate is blocked.
+        """
+
+        for offset_column, offset_row in candidates:
+            column, row = creature_column + offset_column, creature_row + offset_row
+            if not self._check_collision(grid, column, row):
+                entities.set_position(creature_id, column, row)
+                grid.move(creature_column, creature_row, column, row)
+                return True
         return False
 
-    def move_creature(self, objects: dict, object_size: int, map_size: tuple) -> None:
-        """
-        Positions visual element of a random creature into the new coordinates.
-        :param objects: All objects on screen.
-        :param object_size: Tile size.
-        :param map_size: Maximum coordinates on screen.
-        :return:
-        """
-
-        all_creatures = {k: v for k, v in objects.items() if "creature" in k}
-        creature_k = random.choice(list(all_creatures.keys()))
-        creature_x, creature_y = int(float(creature_k.split("_")[1])), int(float(creature_k.split("_")[2]))
-        object_creature = all_creatures[creature_k]["creature"]
-        while True:
-            x = int(random.randrange(creature_x - object_size, creature_x + object_size * 2, object_size))
-            y = int(random.randrange(creature_y - object_size, creature_y + object_size * 2, object_size))
-            if self._check_inside_map(x, y, map_size):
-                all_objects = {k: v for k, v in objects.items() if "obstacle" in k or "creature" in k}
-                if not self._check_collision(all_objects, x, y, object_size):
-                    object_creature.pos = x, y
-                    objects[f"creature_{x}_{y}"] = objects.pop(creature_k)
-
-                    Logger.info(f'Action Generator: Move creature to {x}, {y}')
-                    break
+    def move_creatures(self,
+                       entities: EntityStore,
+                       grid: TileGrid,
+                       move_chance: float = None,
+                       attempt_budget: int = 8) -> list:
+        """
+        Plans a move for the whole creature population in one pass. Every creature moves with the given chance,
+        tries at most the budgeted number of neighbor tiles and gives up if they are all blocked. Moves are resolved
+        in order, so a tile claimed by one creature is seen as blocked by the next ones.
+        :param entities: All objects on screen.
+        :param grid: Occupancy index of the tiles.
+        :param move_chance: Chance of each creature to move, one move per call on average if not given.
+        :param attempt_budget: Maximum number of tiles tried per creature.
+        :return: List of moved entity ids.
+        """
+
+        table = entities.tables[EntityKind.CREATURE]
+        creature_amount = len(table)
+        if creature_amount == 0:
+            return []
+
+        move_chance = 1 / creature_amount if move_chance is None else move_chance
+        attempt_budget = min(attempt_budget, len(neighbor_offsets))
+
+        rolls = [self.random.random() for _ in range(creature_amount)]
+        movers = [
+            (table.ids[i], table.columns[i], table.rows[i]) for i in range(creature_amount) if rolls[i] < move_chance
+        ]
+        candidates = [self.random.sample(neighbor_offsets, attempt_budget) for _ in movers]
+
+        moved_creatures = [
+            creature_id
+            for (creature_id, creature_column, creature_row), creature_candidates in zip(movers, candidates)
+            if self._relocate_creature(entities, grid, creature_id, creature_column, creature_row, creature_candidates)
+        ]
+        if moved_creatures:
+            EventLog.debug('Action Generator', 'Move %s creatures', len(moved_creatures))
+        return moved_creatures
 
     def hit_object(self,
-                   objects: dict,
-                   character_x: int,
-                   character_y: int,
-                   object_size: int,
+                   entities: EntityStore,
+                   grid: TileGrid,
+                   character_id: int,
                    tool_power: tuple,
-                   is_obstacle: bool) -> tuple:
+                   is_obstacle: bool,
+                   path_finder: PathFinder = None) -> tuple:
         """
-        Damages the objects next to the coordinates.
-        :param objects: All objects on screen.
-        :param character_x: X coordinate of character.
-        :param character_y: Y coordinate of character.
-        :param object_size: Tile size.
+        Damages the objects next to the character.
+        :param entities: All objects on screen.
+        :param grid: Occupancy index of the tiles.
+        :param character_id: Entity id of the character.
         :param tool_power: Range of the tool power.
         :param is_obstacle: True for obstacle, False for creature.
-        :return: Lists of hit damages and visual elements.
-        """
-
-        hit_damages, removed_objects = [], []
-        object_key = "obstacle" if is_obstacle else "creature"
-        all_objects = {k: v for k, v in objects.items() if object_key in k}
-        collided_objects = self._get_collided_objects(all_objects, character_x, character_y, object_size)
-        if len(collided_objects) > 0:
-            for i in collided_objects:
-                hit_damage = random.randint(tool_power[0], tool_power[1])
-                hit_damages.append(hit_damage)
-                object_health = objects[i]["health"]
-                new_health = object_health - hit_damage
-                if new_health > 0:
-                    objects[i]["health"] = new_health
-                else:
-                    removed_objects.append(objects[i][object_key])
-                    del objects[i]
-
-                Logger.info(f'Action Generator: Hit {i} ({object_health}) by {hit_damage}')
-        return hit_damages, removed_objects
-
-    def hit_by_creature(self,
-                        objects: dict,
-                        character_x: int,
-                        character_y: int,
-                        object_size: int,
-                        character_health: int) -> tuple:
-        """
-        Get damages by the creatures next to the coordinates.
-        :param objects: All objects on screen.
-        :param character_x: X coordinate of character.
-        :param character_y: Y coordinate of character.
-        :param object_size: Tile size.
-        :param character_health: Health of character.
+        :param path_finder: Route cache to be invalidated on the tiles of the removed objects.
+        :return: Lists of hit damages and removed entity ids.
+        """
+
+        kind = EntityKind.OBSTACLE if is_obstacle else EntityKind.CREATURE
+        collided_objects = self._get_collided_objects(entities, grid, *entities.get_position(character_id), kind)
+        if not collided_objects:
+            return [], []
+
+        slots = [entities.get_slot(i) for i in collided_objects]
+        hit_damages = self.combat_resolver.roll([tool_power] * len(collided_objects))
+        kills = self.combat_resolver.apply(entities.tables[kind].healths, slots, hit_damages)
+
+        removed_objects = [collided_objects[i] for i in kills]
+        for i in removed_objects:
+            column, row = entities.get_position(i)
+            grid.remove(column, row)
+            if path_finder is not None:
+                path_finder.invalidate(column, row)
+            entities.remove(i)
+
+        EventLog.debug(
+            'Action Generator', 'Hit %s %s for %s, remove %s', len(collided_objects), kind.name, sum(hit_damages),
+            len(removed_objects)
+        )
+        return hit_damages.tolist(), removed_objects
+
+    def hit_by_creature(self, entities: EntityStore, grid: TileGrid, character_id: int) -> tuple:
+        """
+        Get damages by the creatures next to the character. Every hit adds up, until the character is dead.
+        :param entities: All objects on screen.
+        :param grid: Occupancy index of the tiles.
+        :param character_id: Entity id of the character.
         :return: Lists of hit damages and new health of character.
         """
 
-        hit_damages, new_health = [], character_health
-        all_creatures = {k: v for k, v in objects.items() if "creature" in k}
-        collided_objects = self._get_collided_objects(all_creatures, character_x, character_y, object_size)
-        if len(collided_objects) > 0:
-            for i in collided_objects:
-                object_power = objects[i]["power"]
-                hit_damage = random.randint(object_power[0], object_power[1])
-                hit_damages.append(hit_damage)
-                new_health = character_health - hit_damage
-                if new_health > 0:
-                    objects["character_main"]["health"] = new_health
-                else:
-                    break
-
-                Logger.info(f'Action Generator: Receive {hit_damage} to character ({character_health})')
-        return hit_damages, new_health
+        character_health = entities.get_health(character_id)
+        collided_objects = self._get_collided_objects(
+            entities, grid, *entities.get_position(character_id), EntityKind.CREATURE
+        )
+        if not collided_objects:
+            return [], character_health
+
+        table = entities.tables[EntityKind.CREATURE]
+        slots = [entities.get_slot(i) for i in collided_objects]
+        hit_damages = self.combat_resolver.roll([(table.power_lows[i], table.power_highs[i]) for i in slots])
+        hit_damages, new_health = self.combat_resolver.accumulate(character_health, hit_damages)
+        entities.set_health(character_id, new_health)
+
+        EventLog.debug('Action Generator', 'Receive %s to character (%s)', sum(hit_damages), character_health)
+        return hit_damages.tolist(), new_health
@@ -0,0 +1,51 @@
+import random
+from array import array
+
+
+class CombatResolver:
+    def __init__(self, random_generator: random.Random):
+        self.random = random_generator
+
+    def roll(self, powers: list) -> array:
+        """
+        Draws the damages of all hits at once.
+        :param powers: Range of the power for every hit.
+        :return: Array of damages, each within its range inclusively.
+        """
+
+        random_value = self.random.random
+        return array("i", [low + int(random_value() * (high - low + 1)) for low, high in powers])
+
+    @staticmethod
+    def apply(healths: array, slots: list, damages: array) -> list:
+        """
+        Subtracts the damages from the health column of a table in one pass. Several hits on the same slot add up.
+        :param healths: Health column of the table.
+        :param slots: Slot of the target of every hit.
+        :param damages: Damage of every hit.
+        :return: Indexes of the hits that brought their target to zero health or below, one per target.
+        """
+
+        kills = []
+        for index, (slot, damage) in enumerate(zip(slots, damages)):
+            health = healths[slot] - damage
+            healths[slot] = health
+            if health <= 0 < health + damage:
+                kills.append(index)
+        return kills
+
+    @staticmethod
+    def accumulate(health: int, damages: array) -> tuple:
+        """
+        Adds up the hits on a single target in order, leaving out the ones after it is dead.
+        :param health: Health of the target.
+        :param damages: Damage of every hit.
+        :return: Damages of the landed hits and the health left.
+        """
+
+        total_damage = 0
+        for index, damage in enumerate(damages):
+            total_damage += damage
+            if total_damage >= health:
+                return damages[:index + 1], health - total_damage
+        return damages, health - total_damage
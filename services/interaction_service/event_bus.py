@@ -0,0 +1,78 @@
+from typing import Callable
+
+from enums.game_event import GameEvent
+from services.performance_service.profiler import Profiler
+
+
+class EventBus:
+    max_events = 256
+
+    def __init__(self, droppable_events: tuple = ()):
+        self.droppable_events = set(droppable_events)
+        self.subscribers = {event: [] for event in GameEvent}
+        self.pending = {event: {} for event in GameEvent}
+        self.dropped = {event: 0 for event in GameEvent}
+        self.event_amount = 0
+
+    def subscribe(self, event: GameEvent, callback: Callable) -> None:
+        """
+        Registers a callback to receive the events of the type once per frame.
+        :param event: Event type.
+        :param callback: Function taking the list of keys and payloads, the number of dropped events and the
+        arguments of the dispatch.
+        :return:
+        """
+
+        self.subscribers[event].append(callback)
+
+    def emit(self, event: GameEvent, key=None, payload=None) -> None:
+        """
+        Queues an event until the end of the frame. An event repeating the type and key of a queued one is merged
+        into it: list payloads are joined, others are replaced by the latest. Once the frame holds too many events,
+        new ones of droppable types are dropped and only counted.
+        :param event: Event type.
+        :param key: Subject of the event, e.g. an entity id.
+        :param payload: Details of the event.
+        :return:
+        """
+
+        events = self.pending[event]
+        if key in events:
+            previous_payload = events[key]
+            events[key] = previous_payload + payload if isinstance(previous_payload, list) else payload
+        elif self.event_amount >= self.max_events and event in self.droppable_events:
+            self.dropped[event] += 1
+            Profiler.count("dropped events")
+        else:
+            events[key] = payload
+            self.event_amount += 1
+
+    def dispatch(self, *args) -> None:
+        """
+        Hands the events of the frame to the subscribers, type by type in the order of the event types.
+        :param args: Arguments passed on to every callback, e.g. the screen.
+        :return:
+        """
+
+        if self.event_amount == 0 and not any(self.dropped.values()):
+            return
+
+        pending, dropped = self.pending, self.dropped
+        self.clear()  # events emitted by the callbacks belong to the next frame
+        for event in GameEvent:
+            if not pending[event] and not dropped[event]:
+                continue
+
+            events = list(pending[event].items())
+            for callback in self.subscribers[event]:
+                callback(events, dropped[event], *args)
+
+    def clear(self) -> None:
+        """
+        Forgets the queued events, e.g. when a new level replaces the one they belong to.
+        :return:
+        """
+
+        self.pending = {event: {} for event in GameEvent}
+        self.dropped = {event: 0 for event in GameEvent}
+        self.event_amount = 0
@@ -0,0 +1,66 @@
+from typing import Callable
+
+
+class GameLoop:
+    def __init__(self, tick_duration: float, max_catch_up_ticks: int = 5):
+        self.tick_duration = tick_duration
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.tasks = {}
+        self.accumulator, self.tick, self.is_paused = 0.0, 0, True
+
+    def add_task(self, name: str, callback: Callable, period: int = 1, is_active: bool = True) -> None:
+        """
+        Registers a callback to run on every period of ticks, in the order of registration. Registering the same
+        name again replaces the task instead of adding a duplicate.
+        :param name: Task name.
+        :param callback: Function without arguments.
+        :param period: Number of ticks between two runs.
+        :param is_active: True to run from the next tick, False to keep it idle until activated.
+        :return:
+        """
+
+        self.tasks[name] = [callback, period, is_active]
+
+    def set_active(self, name: str, is_active: bool) -> None:
+        """
+        Enables or disables a task without changing its place in the order.
+        :param name: Task name.
+        :param is_active: True to run, False to skip.
+        :return:
+        """
+
+        self.tasks[name][2] = is_active
+
+    def pause(self) -> None:
+        self.is_paused = True
+        self.accumulator = 0.0
+
+    def resume(self) -> None:
+        self.is_paused = False
+
+    def advance(self, dt: float) -> int:
+        """
+        Runs as many fixed ticks as the elapsed time allows. After a late frame at most a few ticks are caught up
+        and the remaining backlog is dropped, so the game slows down instead of freezing.
+        :param dt: Elapsed time in seconds.
+        :return: Number of ticks run.
+        """
+
+        if self.is_paused:
+            return 0
+
+        self.accumulator += dt
+        ticks = 0
+        while self.accumulator >= self.tick_duration and ticks < self.max_catch_up_ticks:
+            self.accumulator -= self.tick_duration
+            self.tick += 1
+            ticks += 1
+            for callback, period, is_active in list(self.tasks.values()):
+                if is_active and self.tick % period == 0:
+                    callback()
+                if self.is_paused:
+                    return ticks
+
+        if ticks == self.max_catch_up_ticks:
+            self.accumulator = min(self.accumulator, self.tick_duration)
+        return ticks
@@ -0,0 +1,156 @@
+import os
+import struct
+from typing import Callable
+
+from enums.input_type import InputType
+from services.logging_service.logger import Logger
+
+
+class InputRecorder:
+    magic, version = b"TMIR", 1
+    # magic, version, columns, rows, object scale, endless flag, end tick, state hash
+    header = struct.Struct("<4sHiii?I64s")
+    # tick, input type, number of ticks the input repeats on
+    record = struct.Struct("<IBH")
+    payloads = {InputType.LEVEL: struct.Struct("<qQ")}
+    default_payload = struct.Struct("<qq")
+    max_repeat = 65535
+
+    def __init__(self, get_tick: Callable, columns: int, rows: int, object_scale: int, is_endless: bool):
+        self.get_tick = get_tick
+        self.columns, self.rows, self.object_scale, self.is_endless = columns, rows, object_scale, is_endless
+        self.buffer, self.move_run, self.is_started = bytearray(), None, False
+
+    def _append(self, tick: int, input_type: InputType, repeat: int, first_value: int, second_value: int) -> None:
+        """
+        Packs an input at the end of the stream.
+        :param tick: Tick the input is applied on.
+        :param input_type: Input type.
+        :param repeat: Number of consecutive ticks the input is applied on.
+        :param first_value: Level, column or item index.
+        :param second_value: Level seed or row.
+        :return:
+        """
+
+        self.buffer += self.record.pack(tick, input_type, repeat)
+        self.buffer += self.payloads.get(input_type, self.default_payload).pack(first_value, second_value)
+
+    def _flush_move(self) -> None:
+        """
+        Writes the pending run of moves towards the same tile as a single input.
+        :return:
+        """
+
+        if self.move_run is not None:
+            self._append(self.move_run[0], InputType.MOVE, *self.move_run[1:])
+            self.move_run = None
+
+    def record_level(self, level: int, seed: int) -> None:
+        """
+        Records a generated level by its seed, which starts the recording if it has not started yet. A resumed mine
+        cannot be generated again, so the inputs on it are left out.
+        :param level: Mine depth.
+        :param seed: Level seed.
+        :return:
+        """
+
+        self.is_started = True
+        self.record_input(InputType.LEVEL, level, seed)
+
+    def record_input(self, input_type: InputType, first_value: int = 0, second_value: int = 0) -> None:
+        """
+        Records an input received between two ticks, which takes effect before the next tick.
+        :param input_type: Input type.
+        :param first_value: Level or item index.
+        :param second_value: Level seed.
+        :return:
+        """
+
+        if self.is_started:
+            self._flush_move()
+            self._append(self.get_tick() + 1, input_type, 1, first_value, second_value)
+
+    def record_move(self, column: int, row: int) -> None:
+        """
+        Records the tile the character moves towards on the current tick. Consecutive ticks towards the same tile
+        are merged into one input, so holding a touch costs a few bytes.
+        :param column: Column of the target.
+        :param row: Row of the target.
+        :return:
+        """
+
+        if not self.is_started:
+            return
+
+        tick = self.get_tick()
+        if self.move_run is not None:
+            run_tick, repeat, run_column, run_row = self.move_run
+            if run_tick + repeat == tick and (run_column, run_row) == (column, row) and repeat < self.max_repeat:
+                self.move_run[1] += 1
+                return
+            self._flush_move()
+        self.move_run = [tick, 1, column, row]
+
+    def save(self, path: str, state_hash: str) -> None:
+        """
+        Writes the recording with the final state hash of the game, nothing happens if no level was recorded.
+        :param path: File path.
+        :param state_hash: Hexadecimal state hash of the simulation.
+        :return:
+        """
+
+        if not self.is_started:
+            return
+
+        self._flush_move()
+        header = self.header.pack(
+            self.magic,
+            self.version,
+            self.columns,
+            self.rows,
+            self.object_scale,
+            self.is_endless,
+            self.get_tick(),
+            state_hash.encode("ascii")
+        )
+
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            file.write(self.buffer)
+        os.replace(temporary_path, path)
+
+        Logger.info(f'Input Recorder: Save {len(self.buffer)} bytes of inputs until tick {self.get_tick()} into {path}')
+
+    @classmethod
+    def read(cls, path: str) -> tuple:
+        """
+        Reads a recording back.
+        :param path: File path.
+        :return: Header fields as a dictionary and the list of ticks, input types, repeats and values.
+        """
+
+        with open(path, "rb") as file:
+            data = file.read()
+
+        magic, version, columns, rows, object_scale, is_endless, end_tick, state_hash = cls.header.unpack_from(data)
+        if magic != cls.magic or version != cls.version:
+            raise ValueError(f"Unknown recording version {version} in {path}")
+
+        inputs, offset = [], cls.header.size
+        while offset < len(data):
+            tick, input_type, repeat = cls.record.unpack_from(data, offset)
+            offset += cls.record.size
+            payload = cls.payloads.get(InputType(input_type), cls.default_payload)
+            inputs.append((tick, InputType(input_type), repeat, *payload.unpack_from(data, offset)))
+            offset += payload.size
+
+        fields = {
+            "columns": columns,
+            "rows": rows,
+            "object_scale": object_scale,
+            "is_endless": is_endless,
+            "end_tick": end_tick,
+            "state_hash": state_hash.decode("ascii")
+        }
+        return fields, inputs
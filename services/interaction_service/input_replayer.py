@@ -0,0 +1,76 @@
+import time
+
+from enums.input_type import InputType
+from enums.item_type import ItemType
+from services.interaction_service.input_recorder import InputRecorder
+from services.logging_service.logger import Logger
+from services.simulation_service.mine_simulation import MineSimulation
+
+
+class InputReplayer:
+    def __init__(self, path: str):
+        self.fields, self.inputs = InputRecorder.read(path)
+        self.simulation = None
+
+    def _apply(self, tick: int, input_type: InputType, first_value: int, second_value: int) -> None:
+        """
+        Applies an input received before the tick the way the game screen does.
+        :param tick: Tick the input is applied on.
+        :param input_type: Input type.
+        :param first_value: Level or item index.
+        :param second_value: Level seed.
+        :return:
+        """
+
+        simulation = self.simulation
+        if input_type == InputType.LEVEL:
+            if self.fields["is_endless"]:
+                simulation.initialize_endless(second_value)
+            else:
+                simulation.initialize_objects(first_value, second_value)
+                for _ in range(2):
+                    simulation.random.getrandbits(64)  # drawn by the game for the pregenerated next level and retry
+            simulation.tick = tick - 1  # the game counts ticks across levels, so the creature phases line up
+        elif input_type == InputType.SELECT_TOOL:
+            simulation.select_item(list(ItemType)[first_value])
+        elif input_type == InputType.USE_TOOL and simulation.status is not None:
+            simulation.use_tool()
+
+    def run(self) -> tuple:
+        """
+        Feeds the inputs to a fresh simulation tick by tick as fast as possible, without rendering or waiting.
+        :return: True if the final state hash matches the recording, False otherwise, with the number of ticks and
+        the duration in seconds.
+        """
+
+        self.simulation = MineSimulation(
+            self.fields["columns"], self.fields["rows"], object_scale=self.fields["object_scale"]
+        )
+
+        inputs, moves = {}, {}
+        for tick, input_type, repeat, first_value, second_value in self.inputs:
+            if input_type == InputType.MOVE:
+                for i in range(repeat):
+                    moves[tick + i] = first_value, second_value
+            else:
+                inputs.setdefault(tick, []).append((input_type, first_value, second_value))
+
+        start_time = time.perf_counter()
+        for tick in range(1, self.fields["end_tick"] + 1):
+            for input_type, first_value, second_value in inputs.get(tick, ()):
+                self._apply(tick, input_type, first_value, second_value)
+            if self.simulation.status is not None:
+                self.simulation.target = moves.get(tick)
+                self.simulation.step()
+        for tick in sorted(tick for tick in inputs if tick > self.fields["end_tick"]):
+            for input_type, first_value, second_value in inputs[tick]:
+                self._apply(tick, input_type, first_value, second_value)  # received after the last tick, before quit
+        duration = time.perf_counter() - start_time
+
+        state_hash = self.simulation.get_state_hash()
+        is_matched = state_hash == self.fields["state_hash"]
+        Logger.info(
+            f'Input Replayer: Replay {self.fields["end_tick"]} ticks in {duration:.3f}s '
+            f'({"matched" if is_matched else "mismatched"} state hash {state_hash[:12]})'
+        )
+        return is_matched, self.fields["end_tick"], duration
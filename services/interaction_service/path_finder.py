@@ -0,0 +1,120 @@
+import heapq
+
+from enums.entity_kind import EntityKind
+from services.simulation_service.entity_store import EntityStore
+from services.simulation_service.tile_grid import TileGrid, neighbor_offsets
+
+
+class PathFinder:
+    def __init__(self, entities: EntityStore, grid: TileGrid):
+        self.entities = entities
+        self.grid = grid
+        self.routes, self.route_tiles, self.partial_goals = {}, {}, set()
+
+    @staticmethod
+    def _get_distance(tile: tuple, goal: tuple) -> int:
+        """
+        Returns the number of moves between the tiles on an open map, diagonal moves included.
+        :param tile: Column and row.
+        :param goal: Column and row.
+        :return: Distance in tiles.
+        """
+
+        return max(abs(tile[0] - goal[0]), abs(tile[1] - goal[1]))
+
+    def _check_passable(self, column: int, row: int) -> bool:
+        """
+        Determines whether the character can walk on the tile. Creatures are not taken into account as they keep
+        moving, only obstacles block a route.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if passable, False otherwise.
+        """
+
+        if not self.grid.is_inside(column, row):
+            return False
+        occupant = self.grid.get(column, row)
+        return occupant is None or self.entities.kind(occupant) != EntityKind.OBSTACLE
+
+    def _search(self, start: tuple, goal: tuple) -> tuple:
+        """
+        Finds the shortest route with A*, preferring straight lines among routes of equal length. If the goal
+        cannot be reached, e.g. it is under an obstacle, the route leads to the reachable tile closest to it.
+        :param start: Column and row of the character.
+        :param goal: Column and row of the target.
+        :return: List of tiles from start to end and True if the goal is reached, False otherwise.
+        """
+
+        costs, came_from = {start: 0}, {start: None}
+        closest_tile, closest_distance = start, self._get_distance(start, goal)
+        open_tiles = [(closest_distance, 0, 0, start)]
+        while open_tiles:
+            _, _, cost, tile = heapq.heappop(open_tiles)
+            if cost > costs[tile]:
+                continue
+
+            distance = self._get_distance(tile, goal)
+            if distance < closest_distance:
+                closest_tile, closest_distance = tile, distance
+            if tile == goal:
+                break
+
+            for offset_column, offset_row in neighbor_offsets:
+                next_tile = tile[0] + offset_column, tile[1] + offset_row
+                if next_tile in costs and costs[next_tile] <= cost + 1:
+                    continue
+                if not self._check_passable(*next_tile):
+                    continue
+
+                costs[next_tile], came_from[next_tile] = cost + 1, tile
+                straightness = (next_tile[0] - goal[0]) ** 2 + (next_tile[1] - goal[1]) ** 2
+                heapq.heappush(
+                    open_tiles, (cost + 1 + self._get_distance(next_tile, goal), straightness, cost + 1, next_tile)
+                )
+
+        route = [closest_tile]
+        while came_from[route[-1]] is not None:
+            route.append(came_from[route[-1]])
+        return route[::-1], closest_tile == goal
+
+    def get_next_tile(self, start: tuple, goal: tuple):
+        """
+        Returns the next tile on the route. Routes are cached per goal as next-tile links for every tile on them, so
+        following a route costs a lookup per step and a search only happens for new goals or invalidated routes.
+        :param start: Column and row of the character.
+        :param goal: Column and row of the target.
+        :return: Column and row, None if the character is already at the end of the route.
+        """
+
+        route = self.routes.get(goal)
+        if route is None or start not in route:
+            tiles, is_reached = self._search(start, goal)
+
+            route = self.routes.setdefault(goal, {})
+            for tile, next_tile in zip(tiles, tiles[1:] + [None]):
+                route[tile] = next_tile
+                self.route_tiles.setdefault(tile, set()).add(goal)
+            if not is_reached:
+                self.partial_goals.add(goal)
+        return route[start]
+
+    def clear(self) -> None:
+        """
+        Drops every cached route, e.g. when parts of the map are loaded or unloaded.
+        :return:
+        """
+
+        self.routes, self.route_tiles, self.partial_goals = {}, {}, set()
+
+    def invalidate(self, column: int, row: int) -> None:
+        """
+        Drops the routes passing through the changed tile and the routes that could not reach their goal, since
+        the change may have opened a way to it.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return:
+        """
+
+        for goal in self.route_tiles.pop((column, row), set()) | self.partial_goals:
+            self.routes.pop(goal, None)
+        self.partial_goals.clear()
@@ -0,0 +1,91 @@
+import logging
+import sys
+import time
+from collections import deque
+
+from configs import settings
+from services.logging_service.logger import Logger
+
+event_log_level = logging.getLevelName(settings.event_log_level.upper())
+if not isinstance(event_log_level, int):  # an unknown name comes back as a "Level ..." string
+    Logger.warning(f'Event Log: Unknown level {settings.event_log_level}, fall back to INFO')
+    event_log_level = logging.INFO
+
+
+class EventLog:
+    level = event_log_level
+    records = deque(maxlen=settings.event_log_size)
+    previous_excepthook = None
+
+    @classmethod
+    def debug(cls, source: str, message: str, *args) -> None:
+        """
+        Keeps the record in the ring buffer if its level is enabled, the oldest one is dropped once it is full. The
+        message is formatted with its arguments only when the buffer is dumped, so a record costs a tuple until then.
+        :param source: Name of the service emitting the record.
+        :param message: Message with %-style placeholders.
+        :param args: Placeholder values.
+        :return:
+        """
+
+        if logging.DEBUG >= cls.level:
+            cls.records.append((time.time(), logging.DEBUG, source, message, args))
+
+    @classmethod
+    def info(cls, source: str, message: str, *args) -> None:
+        """
+        Keeps the record in the ring buffer like debug, at info level.
+        :param source: Name of the service emitting the record.
+        :param message: Message with %-style placeholders.
+        :param args: Placeholder values.
+        :return:
+        """
+
+        if logging.INFO >= cls.level:
+            cls.records.append((time.time(), logging.INFO, source, message, args))
+
+    @staticmethod
+    def format_record(record: tuple) -> str:
+        """
+        Renders the record as a log line.
+        :param record: Time, level, source, message and arguments.
+        :return: Log line.
+        """
+
+        created_time, level, source, message, args = record
+        clock = time.strftime("%H:%M:%S", time.localtime(created_time))
+        return f"{clock}.{int(created_time % 1 * 1000):03d} {logging.getLevelName(level):<8}{source}: {message % args}"
+
+    @classmethod
+    def dump(cls, stream=None) -> int:
+        """
+        Writes the records in the buffer from the oldest to the newest, keeping them in the buffer.
+        :param stream: Text stream, standard error if not given.
+        :return: Number of records written.
+        """
+
+        stream = sys.stderr if stream is None else stream
+        records = list(cls.records)
+        for record in records:
+            stream.write(cls.format_record(record) + "\n")
+        stream.flush()
+        return len(records)
+
+    @classmethod
+    def install_crash_hook(cls) -> None:
+        """
+        Dumps the buffer when an exception reaches the top of the main thread, before the default report of it.
+        :return:
+        """
+
+        if cls.previous_excepthook is not None:
+            return
+
+        cls.previous_excepthook = sys.excepthook
+
+        def dump_on_crash(exception_type, exception, traceback):
+            Logger.error(f'Event Log: Dump {len(cls.records)} records after {exception_type.__name__}')
+            cls.dump()
+            cls.previous_excepthook(exception_type, exception, traceback)
+
+        sys.excepthook = dump_on_crash
@@ -0,0 +1,3 @@
+import logging
+
+Logger = logging.getLogger("kivy")  # same logger as kivy.Logger, without importing Kivy
@@ -0,0 +1,118 @@
+import csv
+import functools
+import json
+import time
+from typing import Callable
+
+from configs import settings
+from services.logging_service.logger import Logger
+
+
+class Profiler:
+    is_enabled = settings.is_profiler
+    timings, counters = {}, {}
+
+    @classmethod
+    def timed(cls, name: str = None) -> Callable:
+        """
+        Decorates a function to record its duration on every call. If profiling is disabled, the function is
+        returned as it is, so instrumented code costs nothing.
+        :param name: Timing name, qualified name of the function if not given.
+        :return: Decorator.
+        """
+
+        def decorator(function: Callable) -> Callable:
+            if not cls.is_enabled:
+                return function
+
+            timing_name = function.__qualname__ if name is None else name
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start_time = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    cls.record(timing_name, time.perf_counter() - start_time)
+
+            return wrapper
+
+        return decorator
+
+    @classmethod
+    def record(cls, name: str, duration: float) -> None:
+        """
+        Adds a duration to the timing.
+        :param name: Timing name.
+        :param duration: Duration in seconds.
+        :return:
+        """
+
+        timing = cls.timings.get(name)
+        if timing is None:
+            cls.timings[name] = [1, duration, duration]
+        else:
+            timing[0] += 1
+            timing[1] += duration
+            timing[2] = max(timing[2], duration)
+
+    @classmethod
+    def count(cls, name: str, amount: int = 1) -> None:
+        """
+        Increases the counter, e.g. for allocated widgets, started animations or played sounds.
+        :param name: Counter name.
+        :param amount: Increment.
+        :return:
+        """
+
+        if cls.is_enabled:
+            cls.counters[name] = cls.counters.get(name, 0) + amount
+
+    @classmethod
+    def get_rows(cls) -> list:
+        """
+        Returns the timings from the most to the least total time, followed by the counters.
+        :return: List of name, calls, total, mean and max milliseconds.
+        """
+
+        rows = [
+            (name, calls, total * 1000, total / calls * 1000, longest * 1000)
+            for name, (calls, total, longest) in sorted(cls.timings.items(), key=lambda item: -item[1][1])
+        ]
+        rows.extend((name, amount, None, None, None) for name, amount in sorted(cls.counters.items()))
+        return rows
+
+    @classmethod
+    def summary(cls, limit: int = 8) -> str:
+        """
+        Returns the text of the overlay with the most expensive timings and all counters.
+        :param limit: Number of timings.
+        :return: Overlay text.
+        """
+
+        timing_lines = [
+            f"{name[-32:]:<32}{mean:>8.2f}{longest:>8.2f} ms"
+            for name, _, _, mean, longest in cls.get_rows()[:min(limit, len(cls.timings))]
+        ]
+        counter_lines = [f"{name[-32:]:<32}{amount:>8}" for name, amount in sorted(cls.counters.items())]
+        return "\n".join([f"{'timing':<32}{'mean':>8}{'max':>8}"] + timing_lines + counter_lines)
+
+    @classmethod
+    def export(cls, path: str) -> None:
+        """
+        Writes the timings and counters to a csv or json file, picked by the file extension.
+        :param path: File path.
+        :return:
+        """
+
+        header = ("name", "calls", "total_ms", "mean_ms", "max_ms")
+        rows = cls.get_rows()
+        with open(path, "w", newline="") as file:
+            if path.endswith(".csv"):
+                writer = csv.writer(file)
+                writer.writerow(header)
+                writer.writerows(rows)
+            else:
+                json.dump([dict(zip(header, row)) for row in rows], file, indent=2)
+
+        Logger.info(f'Profiler: Export {len(rows)} rows to {path}')
@@ -0,0 +1,33 @@
+import time
+
+from services.logging_service.logger import Logger
+
+
+class StartupTimer:
+    start_time, marks = time.perf_counter(), []
+
+    @classmethod
+    def mark(cls, name: str) -> None:
+        """
+        Records the time elapsed since the process started importing the game.
+        :param name: Startup step name.
+        :return:
+        """
+
+        cls.marks.append((name, time.perf_counter() - cls.start_time))
+
+    @classmethod
+    def report(cls) -> str:
+        """
+        Logs every startup step with its total and own duration.
+        :return: Report text.
+        """
+
+        lines, previous_time = [], 0.0
+        for name, elapsed_time in cls.marks:
+            lines.append(f"{name:<24}{elapsed_time * 1000:>10.1f} ms{(elapsed_time - previous_time) * 1000:>10.1f} ms")
+            previous_time = elapsed_time
+
+        report = "\n".join([f"{'step':<24}{'total':>13}{'own':>13}"] + lines)
+        Logger.info(f'Startup Timer: Report\n{report}')
+        return report
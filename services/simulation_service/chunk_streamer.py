@@ -0,0 +1,172 @@
+import random
+from collections import OrderedDict
+from typing import Callable
+
+from enums.entity_kind import EntityKind
+from services.logging_service.logger import Logger
+from services.simulation_service.chunked_grid import ChunkedGrid
+from services.simulation_service.entity_store import EntityStore
+
+
+class ChunkStreamer:
+    load_radius, chunks_per_level = 2, 2
+
+    def __init__(self,
+                 entities: EntityStore,
+                 grid: ChunkedGrid,
+                 world_seed: int,
+                 get_object_amounts: Callable,
+                 add_object: Callable,
+                 max_chunks: int = None):
+        self.entities, self.grid, self.world_seed = entities, grid, world_seed
+        self.get_object_amounts, self.add_object = get_object_amounts, add_object
+
+        self.chunk_columns = -(-grid.columns // grid.chunk_size)
+        self.surface_chunk_row = (grid.rows - 1) // grid.chunk_size
+        self.max_chunks = self.chunk_columns * (2 * self.load_radius + 1) * 2 if max_chunks is None else max_chunks
+
+        self.loaded, self.origins, self.deltas, self.removed_ids = OrderedDict(), {}, {}, {}
+        self.reserved_tiles, self.revision = set(), 0
+
+    def get_level(self, row: int) -> int:
+        """
+        Returns the mine depth of the row, which grows every few chunks under the surface.
+        :param row: Row of the tile.
+        :return: Mine depth.
+        """
+
+        return 1 + (self.surface_chunk_row - row // self.grid.chunk_size) // self.chunks_per_level
+
+    def _generate(self, chunk: tuple) -> list:
+        """
+        Lays out the objects of the chunk from the world seed and the chunk coordinates only, so a chunk comes back
+        the same every time it is loaded.
+        :param chunk: Column and row of the chunk.
+        :return: List of kinds, columns, rows and variants.
+        """
+
+        chunk_random = random.Random(f"{self.world_seed}:{chunk[0]}:{chunk[1]}")
+        chunk_size = self.grid.chunk_size
+        level = self.get_level(chunk[1] * chunk_size)
+        obstacle_amount, creature_amount = self.get_object_amounts(level)
+
+        indexes = chunk_random.sample(range(chunk_size * chunk_size), obstacle_amount + creature_amount)
+        kinds = [EntityKind.OBSTACLE] * obstacle_amount + [EntityKind.CREATURE] * creature_amount
+        return [
+            (kind, chunk[0] * chunk_size + index % chunk_size, chunk[1] * chunk_size + index // chunk_size,
+             chunk_random.randint(1, 3))
+            for kind, index in zip(kinds, indexes)
+        ]
+
+    def _load(self, chunk: tuple) -> None:
+        """
+        Adds the chunk to the grid with its objects, leaving out the ones removed on an earlier visit.
+        :param chunk: Column and row of the chunk.
+        :return:
+        """
+
+        self.grid.load_chunk(chunk)
+        delta = self.deltas.get(chunk)
+        origin_ids = set()
+        for spawn_index, (kind, column, row, variant) in enumerate(self._generate(chunk)):
+            if delta is not None and spawn_index // 8 < len(delta) and delta[spawn_index // 8] & 1 << spawn_index % 8:
+                continue
+            if not self.grid.is_inside(column, row) or (column, row) in self.reserved_tiles:
+                continue
+
+            entity_id = self.add_object(kind, column, row, self.get_level(row), variant)
+            self.origins[entity_id] = chunk, spawn_index
+            origin_ids.add(entity_id)
+
+        self.loaded[chunk] = origin_ids
+
+    def _drop(self, entity_id: int) -> None:
+        """
+        Removes a streamed object without recording it as destroyed, so it comes back with its chunk.
+        :param entity_id: Entity id.
+        :return:
+        """
+
+        if not self.entities.is_alive(entity_id):
+            return
+
+        column, row = self.entities.get_position(entity_id)
+        if self.grid.is_inside(column, row) and self.grid.get(column, row) == entity_id:
+            self.grid.remove(column, row)
+        self.entities.remove(entity_id)
+        self.entities.recycle(entity_id)
+
+        chunk, _ = self.origins.pop(entity_id)
+        if chunk in self.loaded:
+            self.loaded[chunk].discard(entity_id)
+
+    def _evict(self, chunk: tuple) -> None:
+        """
+        Drops the chunk with the objects spawned on it and the ones that wandered onto it. Their ids are recycled
+        with the ids of the objects of the chunk destroyed earlier, which keeps the id index of the entity store
+        bounded however far the mine is dug. A chunk is evicted long after its objects are destroyed, once it is
+        far from the character, so the screen no longer refers to them.
+        :param chunk: Column and row of the chunk.
+        :return:
+        """
+
+        for entity_id in self.removed_ids.pop(chunk, ()):
+            self.entities.recycle(entity_id)
+
+        for entity_id in list(self.loaded.pop(chunk)):
+            self._drop(entity_id)
+        for entity_id in self.grid.unload_chunk(chunk):
+            self._drop(entity_id)
+
+    def stream(self, column: int, row: int) -> bool:
+        """
+        Loads the chunks around the tile and evicts the least recently used ones beyond the budget, never the ones
+        around the tile.
+        :param column: Column of the character.
+        :param row: Row of the character.
+        :return: True if any chunk is loaded or evicted, False otherwise.
+        """
+
+        _, chunk_row = self.grid.get_chunk(column, row)
+        required_chunks = [
+            (i, j)
+            for j in range(chunk_row - self.load_radius, min(chunk_row + self.load_radius, self.surface_chunk_row) + 1)
+            for i in range(self.chunk_columns)
+        ]
+
+        is_changed = False
+        for chunk in required_chunks:
+            if chunk not in self.loaded:
+                self._load(chunk)
+                is_changed = True
+            self.loaded.move_to_end(chunk)
+
+        while len(self.loaded) > max(self.max_chunks, len(required_chunks)):
+            self._evict(next(iter(self.loaded)))
+            is_changed = True
+
+        if is_changed:
+            self.revision += 1
+            Logger.info(f'Chunk Streamer: Keep {len(self.loaded)} chunks and {len(self.deltas)} deltas around {row}')
+        return is_changed
+
+    def record_removed(self, removed_ids: list) -> None:
+        """
+        Marks the destroyed objects in the delta of their chunk, a bit per object, so they stay destroyed when the
+        chunk is evicted and loaded again.
+        :param removed_ids: List of entity ids.
+        :return:
+        """
+
+        for entity_id in removed_ids:
+            origin = self.origins.pop(entity_id, None)
+            if origin is None:
+                continue
+
+            chunk, spawn_index = origin
+            delta = self.deltas.setdefault(chunk, bytearray())
+            if spawn_index // 8 >= len(delta):
+                delta.extend(bytes(spawn_index // 8 + 1 - len(delta)))
+            delta[spawn_index // 8] |= 1 << spawn_index % 8
+            self.loaded[chunk].discard(entity_id)
+            self.removed_ids.setdefault(chunk, []).append(entity_id)
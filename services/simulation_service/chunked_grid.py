@@ -0,0 +1,145 @@
+class ChunkedGrid:
+    def __init__(self, columns: int, rows: int, chunk_size: int):
+        self.columns = columns
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self._chunks = {}
+
+    def get_chunk(self, column: int, row: int) -> tuple:
+        """
+        Returns the chunk holding the tile, rows below zero belong to chunks with negative rows.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: Column and row of the chunk.
+        """
+
+        return column // self.chunk_size, row // self.chunk_size
+
+    def is_loaded(self, chunk: tuple) -> bool:
+        """
+        Determines whether the tiles of the chunk are in the grid.
+        :param chunk: Column and row of the chunk.
+        :return: True if loaded, False otherwise.
+        """
+
+        return chunk in self._chunks
+
+    def load_chunk(self, chunk: tuple) -> None:
+        """
+        Adds the free tiles of the chunk to the grid.
+        :param chunk: Column and row of the chunk.
+        :return:
+        """
+
+        self._chunks[chunk] = [None] * (self.chunk_size * self.chunk_size)
+
+    def unload_chunk(self, chunk: tuple) -> list:
+        """
+        Drops the tiles of the chunk from the grid.
+        :param chunk: Column and row of the chunk.
+        :return: List of the occupant ids left on the chunk.
+        """
+
+        return [occupant for occupant in self._chunks.pop(chunk) if occupant is not None]
+
+    def is_inside(self, column: int, row: int) -> bool:
+        """
+        Determines whether the tile is within the map width, under the surface and on a loaded chunk.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if inside, False otherwise.
+        """
+
+        return 0 <= column < self.columns and row < self.rows and self.get_chunk(column, row) in self._chunks
+
+    def _get_cells(self, column: int, row: int) -> tuple:
+        """
+        Locates the tile in its chunk.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: Cells of the chunk and index of the tile in them.
+        """
+
+        cells = self._chunks[column // self.chunk_size, row // self.chunk_size]
+        return cells, (row % self.chunk_size) * self.chunk_size + column % self.chunk_size
+
+    def get(self, column: int, row: int):
+        """
+        Returns the occupant of the tile.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: Occupant id, None if the tile is free or outside the grid.
+        """
+
+        if not self.is_inside(column, row):
+            return None
+        cells, index = self._get_cells(column, row)
+        return cells[index]
+
+    def is_free(self, column: int, row: int) -> bool:
+        """
+        Determines whether the tile is inside the grid and not occupied.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if free, False otherwise.
+        """
+
+        if not self.is_inside(column, row):
+            return False
+        cells, index = self._get_cells(column, row)
+        return cells[index] is None
+
+    def place(self, column: int, row: int, occupant) -> None:
+        """
+        Marks the tile as occupied.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :param occupant: Occupant id.
+        :return:
+        """
+
+        cells, index = self._get_cells(column, row)
+        cells[index] = occupant
+
+    def remove(self, column: int, row: int):
+        """
+        Marks the tile as free.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: Previous occupant id.
+        """
+
+        cells, index = self._get_cells(column, row)
+        occupant, cells[index] = cells[index], None
+        return occupant
+
+    def move(self, column: int, row: int, new_column: int, new_row: int, occupant=None) -> None:
+        """
+        Moves the occupant of a tile into another one.
+        :param column: Current column of the occupant.
+        :param row: Current row of the occupant.
+        :param new_column: New column of the occupant.
+        :param new_row: New row of the occupant.
+        :param occupant: New occupant id, the current one is kept if not given.
+        :return:
+        """
+
+        previous_occupant = self.remove(column, row)
+        self.place(new_column, new_row, previous_occupant if occupant is None else occupant)
+
+    def neighbors(self, column: int, row: int, radius: int = 1) -> list:
+        """
+        Returns the occupants around the tile, including the tile itself.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :param radius: Distance in tiles.
+        :return: List of occupant ids.
+        """
+
+        occupants = []
+        for j in range(row - radius, row + radius + 1):
+            for i in range(column - radius, column + radius + 1):
+                occupant = self.get(i, j)
+                if occupant is not None:
+                    occupants.append(occupant)
+        return occupants
@@ -0,0 +1,203 @@
+from array import array
+
+from enums.entity_kind import EntityKind
+
+
+class EntityTable:
+    __slots__ = ("ids", "columns", "rows", "healths", "power_lows", "power_highs", "variants")
+
+    def __init__(self):
+        self.ids = array("i")
+        self.columns = array("i")
+        self.rows = array("i")
+        self.healths = array("i")
+        self.power_lows = array("i")
+        self.power_highs = array("i")
+        self.variants = array("b")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, entity_id: int, column: int, row: int, health: int, power: tuple, variant: int) -> int:
+        """
+        Adds a row for the entity at the end of the table.
+        :param entity_id: Entity id.
+        :param column: Column of the entity.
+        :param row: Row of the entity.
+        :param health: Health of the entity.
+        :param power: Range of the entity power.
+        :param variant: Sprite variant of the entity.
+        :return: Slot of the entity in the table.
+        """
+
+        self.ids.append(entity_id)
+        self.columns.append(column)
+        self.rows.append(row)
+        self.healths.append(health)
+        self.power_lows.append(power[0])
+        self.power_highs.append(power[1])
+        self.variants.append(variant)
+        return len(self.ids) - 1
+
+    def get_arrays(self) -> tuple:
+        """
+        Returns the columns of the table in a fixed order, e.g. to be written into a snapshot.
+        :return: Tuple of arrays.
+        """
+
+        return self.ids, self.columns, self.rows, self.healths, self.power_lows, self.power_highs, self.variants
+
+    def set_arrays(self, arrays: tuple) -> None:
+        """
+        Replaces the columns of the table, in the order returned by get_arrays.
+        :param arrays: Tuple of arrays.
+        :return:
+        """
+
+        self.ids, self.columns, self.rows, self.healths, self.power_lows, self.power_highs, self.variants = arrays
+
+    def swap_remove(self, slot: int):
+        """
+        Removes the row by moving the last row into its slot, so the table stays contiguous.
+        :param slot: Slot of the entity in the table.
+        :return: Id of the entity moved into the slot, None if the removed row was the last one.
+        """
+
+        last = len(self.ids) - 1
+        moved_id = None
+        if slot != last:
+            moved_id = self.ids[last]
+            for column in (self.ids, self.columns, self.rows, self.healths,
+                           self.power_lows, self.power_highs, self.variants):
+                column[slot] = column[last]
+        for column in (self.ids, self.columns, self.rows, self.healths,
+                       self.power_lows, self.power_highs, self.variants):
+            column.pop()
+        return moved_id
+
+
+class EntityStore:
+    __slots__ = ("tables", "_kinds", "_slots", "_free_ids")
+
+    def __init__(self):
+        self.tables = {kind: EntityTable() for kind in EntityKind}
+        self._kinds = array("b")
+        self._slots = array("i")
+        self._free_ids = []
+
+    def add(self, kind: EntityKind, column: int, row: int, health: int, power: tuple = (0, 0), variant: int = 0) -> int:
+        """
+        Creates a new entity, on a recycled id if there is one.
+        :param kind: Entity kind.
+        :param column: Column of the entity.
+        :param row: Row of the entity.
+        :param health: Health of the entity.
+        :param power: Range of the entity power.
+        :param variant: Sprite variant of the entity.
+        :return: Entity id.
+        """
+
+        if self._free_ids:
+            entity_id = self._free_ids.pop()
+            self._kinds[entity_id] = kind
+            self._slots[entity_id] = self.tables[kind].append(entity_id, column, row, health, power, variant)
+            return entity_id
+
+        entity_id = len(self._kinds)
+        self._kinds.append(kind)
+        self._slots.append(self.tables[kind].append(entity_id, column, row, health, power, variant))
+        return entity_id
+
+    def remove(self, entity_id: int) -> None:
+        """
+        Deletes the entity, its id is not reused unless it is recycled.
+        :param entity_id: Entity id.
+        :return:
+        """
+
+        table = self.tables[self.kind(entity_id)]
+        moved_id = table.swap_remove(self._slots[entity_id])
+        if moved_id is not None:
+            self._slots[moved_id] = self._slots[entity_id]
+        self._kinds[entity_id] = 0
+        self._slots[entity_id] = -1
+
+    def recycle(self, entity_id: int) -> None:
+        """
+        Hands the id of a removed entity to a new entity. Only ids nothing refers to anymore should be recycled,
+        e.g. the screen may still refer to a destroyed entity until the end of the frame to remove its sprite.
+        :param entity_id: Entity id.
+        :return:
+        """
+
+        self._free_ids.append(entity_id)
+
+    def get_arrays(self) -> list:
+        """
+        Returns the id index and the columns of every table in a fixed order, e.g. to be written into a snapshot.
+        :return: List of arrays.
+        """
+
+        arrays = [self._kinds, self._slots]
+        for kind in EntityKind:
+            arrays.extend(self.tables[kind].get_arrays())
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: list):
+        """
+        Creates an entity store on the arrays, in the order returned by get_arrays, without copying them row by row.
+        :param arrays: List of arrays.
+        :return: Entity store.
+        """
+
+        entities = cls()
+        entities._kinds, entities._slots = arrays[0], arrays[1]
+        offset = 2
+        for kind in EntityKind:
+            table = entities.tables[kind]
+            table.set_arrays(tuple(arrays[offset:offset + len(table.__slots__)]))
+            offset += len(table.__slots__)
+        return entities
+
+    def is_alive(self, entity_id: int) -> bool:
+        return 0 <= entity_id < len(self._slots) and self._slots[entity_id] >= 0
+
+    def kind(self, entity_id: int) -> EntityKind:
+        return EntityKind(self._kinds[entity_id])
+
+    def ids(self, kind: EntityKind) -> list:
+        """
+        Returns the ids of the alive entities of a kind.
+        :param kind: Entity kind.
+        :return: List of entity ids.
+        """
+
+        return self.tables[kind].ids.tolist()
+
+    def count(self, kind: EntityKind) -> int:
+        return len(self.tables[kind])
+
+    def get_slot(self, entity_id: int) -> int:
+        return self._slots[entity_id]
+
+    def get_position(self, entity_id: int) -> tuple:
+        table, slot = self.tables[self.kind(entity_id)], self._slots[entity_id]
+        return table.columns[slot], table.rows[slot]
+
+    def set_position(self, entity_id: int, column: int, row: int) -> None:
+        table, slot = self.tables[self.kind(entity_id)], self._slots[entity_id]
+        table.columns[slot], table.rows[slot] = column, row
+
+    def get_health(self, entity_id: int) -> int:
+        return self.tables[self.kind(entity_id)].healths[self._slots[entity_id]]
+
+    def set_health(self, entity_id: int, health: int) -> None:
+        self.tables[self.kind(entity_id)].healths[self._slots[entity_id]] = health
+
+    def get_power(self, entity_id: int) -> tuple:
+        table, slot = self.tables[self.kind(entity_id)], self._slots[entity_id]
+        return table.power_lows[slot], table.power_highs[slot]
+
+    def get_variant(self, entity_id: int) -> int:
+        return self.tables[self.kind(entity_id)].variants[self._slots[entity_id]]
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from services.logging_service.logger import Logger
+from services.simulation_service.mine_simulation import MineSimulation
+
+
+class LevelPregenerator:
+    def __init__(self, columns: int, rows: int, object_scale: int = 1):
+        self.columns, self.rows, self.object_scale = columns, rows, object_scale
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level_pregenerator")
+        self.futures = {}
+
+    def _generate(self, level: int, seed: int) -> MineSimulation:
+        """
+        Generates the level on a fresh simulation that no other thread touches until it is taken.
+        :param level: Mine depth.
+        :param seed: Level seed.
+        :return: Simulation of the level.
+        """
+
+        simulation = MineSimulation(self.columns, self.rows, object_scale=self.object_scale)
+        simulation.initialize_objects(level, seed=seed)
+        return simulation
+
+    def request(self, level: int, seed: int) -> None:
+        """
+        Starts generating the level in the background after the levels requested before it.
+        :param level: Mine depth.
+        :param seed: Level seed, drawn on the caller thread to keep the level sequence reproducible.
+        :return:
+        """
+
+        self.futures[level] = self.executor.submit(self._generate, level, seed)
+
+        Logger.info(f'Level Pregenerator: Request level {level}')
+
+    def take(self, level: int):
+        """
+        Hands over the pre-generated level, waiting for the worker if it is not ready yet. The other requested
+        levels are dropped, as they were alternatives to the level being started.
+        :param level: Mine depth.
+        :return: Simulation of the level, None if the level was not requested.
+        """
+
+        future = self.futures.pop(level, None)
+        for other_future in self.futures.values():
+            other_future.cancel()
+        self.futures = {}
+
+        if future is None:
+            return None
+        return future.result()
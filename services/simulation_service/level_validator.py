@@ -0,0 +1,81 @@
+from collections import deque
+
+from enums.entity_kind import EntityKind
+from services.simulation_service.entity_store import EntityStore
+from services.simulation_service.tile_grid import TileGrid, neighbor_offsets
+
+
+class LevelValidator:
+    def __init__(self, entities: EntityStore, grid: TileGrid):
+        self.entities = entities
+        self.grid = grid
+
+    def count_digs(self, start: tuple, goal: tuple, blocking_kinds: tuple = (EntityKind.OBSTACLE, )):
+        """
+        Flood fills the map from the start, where crossing a free tile is free and crossing a blocking one costs a
+        dig. Tiles reached without digging form the connected region of the start, every dig opens the next region.
+        :param start: Column and row of the character.
+        :param goal: Column and row of the exit.
+        :param blocking_kinds: Entity kinds that have to be removed to pass.
+        :return: Minimum number of objects to be removed to reach the goal, None if it is unreachable.
+        """
+
+        # the map is padded with a border of walls, so neighbors are plain index offsets without bound checks
+        width = self.grid.columns + 2
+        wall = 255
+        weights = bytearray([wall]) * (width * (self.grid.rows + 2))
+        for row in range(1, self.grid.rows + 1):
+            weights[row * width + 1:row * width + 1 + self.grid.columns] = bytes(self.grid.columns)
+        for kind in blocking_kinds:
+            table = self.entities.tables[kind]
+            for column, row in zip(table.columns, table.rows):
+                weights[(row + 1) * width + column + 1] = 1
+
+        offsets = [offset_row * width + offset_column for offset_column, offset_row in neighbor_offsets]
+        start_index, goal_index = (start[1] + 1) * width + start[0] + 1, (goal[1] + 1) * width + goal[0] + 1
+        distances = [len(weights)] * len(weights)
+        distances[start_index] = 0
+        is_done = bytearray(len(weights))
+        queue = deque([start_index])
+        pop, push, push_front = queue.popleft, queue.append, queue.appendleft
+        while queue:
+            index = pop()
+            if is_done[index]:
+                continue
+            if index == goal_index:
+                return distances[index]
+            is_done[index] = 1
+
+            current_distance = distances[index]
+            for offset in offsets:
+                next_index = index + offset
+                weight = weights[next_index]
+                if weight == wall or is_done[next_index]:
+                    continue
+
+                distance = current_distance + weight
+                # tiles leave the queue in order of distance, so the first way into the goal is the shortest
+                if next_index == goal_index:
+                    return distance
+                if distance < distances[next_index]:
+                    distances[next_index] = distance
+                    if weight:
+                        push(next_index)
+                    else:
+                        push_front(next_index)
+        return None
+
+    def validate(self, start: tuple, goal: tuple) -> tuple:
+        """
+        Checks whether the exit can be reached by mining and whether creatures stand on the cheapest way to it.
+        :param start: Column and row of the character.
+        :param goal: Column and row of the exit.
+        :return: Minimum number of digs, None if unreachable, and True if creatures have to be fought on the way.
+        """
+
+        digs = self.count_digs(start, goal)
+        if digs is None:
+            return None, False
+
+        guarded_digs = self.count_digs(start, goal, blocking_kinds=(EntityKind.OBSTACLE, EntityKind.CREATURE))
+        return digs, guarded_digs != digs
@@ -0,0 +1,100 @@
+from enums.entity_kind import EntityKind
+from enums.game_status import GameStatus
+from enums.item_type import ItemType
+from services.simulation_service.mine_simulation import MineSimulation
+
+
+class MineBot:
+    attack_ticks = 4  # a hit every 0.2 seconds, about as fast as a player double taps
+
+    def __init__(self, simulation: MineSimulation):
+        self.simulation = simulation
+        self.dig_target, self.last_tile = None, None
+
+    def _get_neighbors(self, kind: EntityKind) -> list:
+        """
+        Returns the objects of the kind next to the character, the ones the active tool would hit.
+        :param kind: Entity kind.
+        :return: List of entity ids.
+        """
+
+        entities = self.simulation.entities
+        column, row = entities.get_position(self.simulation.character_id)
+        return [i for i in self.simulation.grid.neighbors(column, row) if entities.kind(i) == kind]
+
+    def _find_dig_target(self):
+        """
+        Picks the obstacle closest to the character, as a player looking for the exit would dig the nearby rocks
+        first. The exit is not known until its obstacle is removed.
+        :return: Entity id of the obstacle, None if there is no obstacle left.
+        """
+
+        entities = self.simulation.entities
+        column, row = entities.get_position(self.simulation.character_id)
+        table = entities.tables[EntityKind.OBSTACLE]
+        distances = [
+            (max(abs(c - column), abs(r - row)), i) for i, c, r in zip(table.ids, table.columns, table.rows)
+        ]
+        return min(distances)[1] if distances else None
+
+    def _use(self, item_type: ItemType) -> None:
+        """
+        Hits with the item, switching to it first if needed.
+        :param item_type: Item type.
+        :return:
+        """
+
+        if self.simulation.action_generator.active_item != item_type:
+            self.simulation.select_item(item_type)
+        self.simulation.use_tool()
+
+    def act(self) -> None:
+        """
+        Decides what to do before the next tick: walk onto the exit once it is uncovered, fight the creatures next
+        to the character, e.g. one standing on the exit, otherwise dig towards the closest obstacle. Whatever blocks
+        the way is hit.
+        :return:
+        """
+
+        simulation = self.simulation
+        entities, grid = simulation.entities, simulation.grid
+        tile = entities.get_position(simulation.character_id)
+        is_stuck = simulation.target is not None and tile == self.last_tile
+        is_attack = simulation.tick % self.attack_ticks == 0
+        self.last_tile = tile
+
+        exit_occupant = grid.get(*simulation.exit_tile)
+        if exit_occupant is not None and entities.kind(exit_occupant) == EntityKind.OBSTACLE:
+            if self.dig_target is None or not entities.is_alive(self.dig_target):
+                self.dig_target = self._find_dig_target()
+            simulation.target = simulation.exit_tile if self.dig_target is None else entities.get_position(
+                self.dig_target
+            )
+        else:
+            simulation.target = simulation.exit_tile
+            if exit_occupant is None and not is_stuck:
+                return  # a creature on the exit is fought like any other once the character is next to it
+
+        if not is_attack:
+            return
+        if self._get_neighbors(EntityKind.CREATURE):
+            self._use(ItemType.BASIC_SWORD)
+        elif is_stuck or self.dig_target in self._get_neighbors(EntityKind.OBSTACLE):
+            self._use(ItemType.BASIC_PICKAXE)
+
+    def play(self, max_ticks: int) -> tuple:
+        """
+        Plays the level until the character finds the exit, dies or runs out of time.
+        :param max_ticks: Number of ticks before giving up.
+        :return: Game status, number of ticks played and damage taken by the character.
+        """
+
+        simulation = self.simulation
+        while simulation.status == GameStatus.PLAYING and simulation.tick < max_ticks:
+            self.act()
+            simulation.step()
+
+        health = simulation.entities.get_health(simulation.character_id)
+        if simulation.status == GameStatus.DEAD:
+            health = 0
+        return simulation.status, simulation.tick, simulation.character_health - health
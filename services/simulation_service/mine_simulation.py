@@ -0,0 +1,340 @@
+import hashlib
+import random
+import struct
+from array import array
+
+from enums.entity_kind import EntityKind
+from enums.game_event import GameEvent
+from enums.game_status import GameStatus
+from enums.item_class import ItemClass
+from enums.item_type import ItemType
+from enums.move_status import MoveStatus
+from services.interaction_service.action_generator import ActionGenerator
+from services.interaction_service.event_bus import EventBus
+from services.interaction_service.path_finder import PathFinder
+from services.logging_service.logger import Logger
+from services.simulation_service.chunk_streamer import ChunkStreamer
+from services.simulation_service.chunked_grid import ChunkedGrid
+from services.simulation_service.entity_store import EntityStore
+from services.simulation_service.level_validator import LevelValidator
+from services.simulation_service.tile_grid import TileGrid
+
+
+class MineSimulation:
+    tile_amount, max_level_multiplier, character_health = 20, 7, 100
+    tick_duration, relocate_ticks, danger_ticks = 0.05, 2, 20
+    chunk_size = 16
+
+    def __init__(self, columns: int, rows: int, seed=None, object_scale: int = 1):
+        self.columns, self.rows, self.seed = columns, rows, seed
+        self.object_scale = object_scale
+        self.random = random.Random(seed)
+        self.action_generator = ActionGenerator(self.random)
+        self.entities, self.grid, self.path_finder, self.character_id, self.exit_tile = None, None, None, None, None
+        self.level, self.level_multiplier, self.level_seed = None, None, None
+        self.exit_digs, self.is_exit_guarded = None, None
+        self.tick, self.status, self.target = 0, None, None
+        self.chunk_streamer, self.event_bus = None, None
+
+    def _emit(self, event: GameEvent, key=None, payload=None) -> None:
+        """
+        Tells the presentation what happened, nothing happens when the simulation runs headless.
+        :param event: Event type.
+        :param key: Subject of the event, e.g. an entity id.
+        :param payload: Details of the event.
+        :return:
+        """
+
+        if self.event_bus is not None:
+            self.event_bus.emit(event, key, payload)
+
+    def attach(self, event_bus: EventBus) -> None:
+        """
+        Sends the events of the simulation to the bus from now on.
+        :param event_bus: Event bus of the game.
+        :return:
+        """
+
+        self.event_bus = event_bus
+
+    def _generate_tiles(self, amount: int) -> list:
+        """
+        Picks random free tiles, keeping the first column and row of the map free.
+        :param amount: Number of tiles.
+        :return: List of columns and rows.
+        """
+
+        excluded = (self.entities.get_position(self.character_id),) if self.character_id is not None else ()
+        return self.grid.sample_free(amount, self.random, border=1, excluded=excluded)
+
+    def get_object_amounts(self) -> tuple:
+        """
+        Returns how many objects the current level has, multiplied by the object scale on maps larger than a screen.
+        :return: Number of obstacles and creatures.
+        """
+
+        return (
+            ((self.tile_amount // 2) + self.level_multiplier) * self.object_scale,
+            ((self.tile_amount // 3) + self.level_multiplier) * self.object_scale
+        )
+
+    def get_chunk_object_amounts(self, level: int) -> tuple:
+        """
+        Returns how many objects a chunk of the endless mine has, keeping the object density of a level.
+        :param level: Mine depth of the chunk.
+        :return: Number of obstacles and creatures.
+        """
+
+        level_multiplier = min(level, self.max_level_multiplier)
+        chunk_ratio = self.chunk_size * self.chunk_size * self.object_scale / (self.columns * self.rows)
+        return (
+            max(1, round(((self.tile_amount // 2) + level_multiplier) * chunk_ratio)),
+            max(1, round(((self.tile_amount // 3) + level_multiplier) * chunk_ratio))
+        )
+
+    def _add_object(self, kind: EntityKind, column: int, row: int, level_multiplier: int, variant: int) -> int:
+        """
+        Creates an obstacle or a creature as strong as the level multiplier and places it on the grid.
+        :param kind: Entity kind.
+        :param column: Column of the object.
+        :param row: Row of the object.
+        :param level_multiplier: Difficulty of the level.
+        :param variant: Sprite variant.
+        :return: Entity id.
+        """
+
+        level_multiplier = min(level_multiplier, self.max_level_multiplier)
+        if kind == EntityKind.CREATURE:
+            power = 5 * level_multiplier, 15 * level_multiplier
+        else:
+            power = 0, 0
+
+        object_id = self.entities.add(kind, column, row, health=50 * level_multiplier, power=power, variant=variant)
+        self.grid.place(column, row, object_id)
+        return object_id
+
+    def _reset_level(self, level: int, seed: int = None, grid=None) -> None:
+        """
+        Empties the map and seeds the random generator for a new level.
+        :param level: Mine depth.
+        :param seed: Level seed for a reproducible layout, drawn from the simulation if not given.
+        :param grid: Occupancy index to be used, a grid of the map size if not given.
+        :return:
+        """
+
+        self.level_seed = self.random.getrandbits(64) if seed is None else seed
+        self.random.seed(self.level_seed)
+
+        self.entities = EntityStore()
+        self.grid = TileGrid(self.columns, self.rows) if grid is None else grid
+        self.path_finder = PathFinder(self.entities, self.grid)
+        self.chunk_streamer = None
+        self.character_id, self.exit_tile = None, None
+        self.level = level
+        self.level_multiplier = level  # TODO: int(math.log(level + 1, 2))
+        self.tick, self.status, self.target = 0, GameStatus.PLAYING, None
+
+    def initialize_objects(self, level: int, seed: int = None) -> None:
+        """
+        Generates a new level with the character, obstacles and creatures, and measures how many digs its exit
+        needs and whether creatures stand on every cheapest way to it.
+        :param level: Mine depth.
+        :param seed: Level seed for a reproducible layout, drawn from the simulation if not given.
+        :return:
+        """
+
+        self._reset_level(level, seed)
+
+        obstacle_amount, creature_amount = self.get_object_amounts()
+        free_amount = self.grid.count_free(border=1)
+        if 1 + obstacle_amount + creature_amount > free_amount:
+            raise ValueError(
+                f"Level {level} needs {1 + obstacle_amount + creature_amount} tiles but the map has {free_amount}"
+            )
+
+        self.create_character()
+        self.create_obstacles()
+        self.create_creatures()
+
+        level_validator = LevelValidator(self.entities, self.grid)
+        self.exit_digs, self.is_exit_guarded = level_validator.validate(
+            self.entities.get_position(self.character_id), self.exit_tile
+        )
+
+        Logger.info(
+            f'Mine Simulation: Initialize level {level} with seed {self.level_seed} '
+            f'({self.exit_digs} digs{", guarded" if self.is_exit_guarded else ""})'
+        )
+
+    def initialize_endless(self, seed: int = None) -> None:
+        """
+        Starts an endless descent, where the mine below the surface is streamed in chunks around the character
+        instead of being generated as a whole. There is no exit, the level grows with the depth.
+        :param seed: World seed for a reproducible mine, drawn from the simulation if not given.
+        :return:
+        """
+
+        self._reset_level(1, seed, grid=ChunkedGrid(self.columns, self.rows, self.chunk_size))
+        self.exit_digs, self.is_exit_guarded = None, False
+        self.chunk_streamer = ChunkStreamer(
+            self.entities, self.grid, self.level_seed, self.get_chunk_object_amounts, self._add_object
+        )
+
+        column, row = self.columns // 2, self.rows - 1
+        self.chunk_streamer.reserved_tiles.add((column, row))
+        self.character_id = self.entities.add(EntityKind.CHARACTER, column, row, health=self.character_health)
+        self.chunk_streamer.stream(column, row)
+
+        Logger.info(f'Mine Simulation: Initialize endless mine with seed {self.level_seed}')
+
+    def create_character(self) -> None:
+        """
+        Assigns random coordinates for character to be placed on.
+        :return:
+        """
+
+        (column, row), = self._generate_tiles(1)
+        self.character_id = self.entities.add(EntityKind.CHARACTER, column, row, health=self.character_health)
+
+        Logger.info(f'Mine Simulation: Create character at {column}, {row}')
+
+    def create_obstacles(self) -> None:
+        """
+        Assigns random coordinates for obstacles to be placed on, the first one hides the exit.
+        :return:
+        """
+
+        for column, row in self._generate_tiles(self.get_object_amounts()[0]):
+            self._add_object(EntityKind.OBSTACLE, column, row, self.level_multiplier, self.random.randint(1, 3))
+
+            if self.exit_tile is None:
+                self.exit_tile = column, row
+
+        Logger.info(f'Mine Simulation: Create {self.entities.count(EntityKind.OBSTACLE)} obstacles')
+
+    def create_creatures(self) -> None:
+        """
+        Assigns random coordinates for creatures to be placed on.
+        :return:
+        """
+
+        for column, row in self._generate_tiles(self.get_object_amounts()[1]):
+            self._add_object(EntityKind.CREATURE, column, row, self.level_multiplier, self.random.randint(1, 3))
+
+        Logger.info(f'Mine Simulation: Create {self.entities.count(EntityKind.CREATURE)} creatures')
+
+    def move_player(self, target_column: float, target_row: float) -> MoveStatus:
+        """
+        Moves the character one tile along the route to the target.
+        :param target_column: Column of the target, possibly fractional.
+        :param target_row: Row of the target, possibly fractional.
+        :return: Move status, arrived once the route to the target is finished.
+        """
+
+        move_status = self.action_generator.move_player(
+            self.entities, self.grid, self.path_finder, self.character_id, target_column, target_row, self.exit_tile
+        )
+        if move_status in (MoveStatus.MOVED, MoveStatus.EXIT):
+            self._emit(GameEvent.MOVED, self.character_id)
+        if move_status == MoveStatus.EXIT:
+            self.status = GameStatus.COMPLETE
+            self._emit(GameEvent.LEVEL_COMPLETE, payload=False)
+
+        if self.chunk_streamer is not None:
+            column, row = self.entities.get_position(self.character_id)
+            if self.chunk_streamer.stream(column, row):
+                self.path_finder.clear()
+            self.level = self.chunk_streamer.get_level(row)
+            self.level_multiplier = min(self.level, self.max_level_multiplier)
+        return move_status
+
+    def move_creatures(self) -> list:
+        """
+        Moves the creature population in one batched pass.
+        :return: List of moved entity ids.
+        """
+
+        moved_creatures = self.action_generator.move_creatures(self.entities, self.grid)
+        for creature_id in moved_creatures:
+            self._emit(GameEvent.MOVED, creature_id)
+        return moved_creatures
+
+    def select_item(self, item_type: ItemType) -> None:
+        """
+        Activates the item to be used by the character.
+        :param item_type: Item type.
+        :return:
+        """
+
+        self.action_generator.active_item = item_type
+        self.action_generator.active_item_power = (item_type.low_bound, item_type.high_bound)
+
+    def use_tool(self) -> tuple:
+        """
+        Hits the obstacles or the creatures next to the character with the active item.
+        :return: Lists of hit damages and removed entity ids.
+        """
+
+        is_obstacle = self.action_generator.active_item.value == ItemClass.PICKAXE
+        hit_damages, removed_objects = self.action_generator.hit_object(
+            self.entities,
+            self.grid,
+            self.character_id,
+            self.action_generator.active_item_power,
+            is_obstacle,
+            self.path_finder
+        )
+        if self.chunk_streamer is not None:
+            self.chunk_streamer.record_removed(removed_objects)
+
+        if hit_damages:
+            self._emit(GameEvent.HIT, False, hit_damages)
+        for object_id in removed_objects:
+            self._emit(GameEvent.KILLED, object_id)
+        return hit_damages, removed_objects
+
+    def hit_by_creature(self) -> tuple:
+        """
+        Applies the damages of the creatures next to the character.
+        :return: Lists of hit damages and new health of character.
+        """
+
+        hit_damages, new_health = self.action_generator.hit_by_creature(self.entities, self.grid, self.character_id)
+        if hit_damages:
+            self._emit(GameEvent.HIT, True, hit_damages)
+            self._emit(GameEvent.DAMAGED, self.character_id, new_health)
+        if new_health <= 0:
+            self.status = GameStatus.DEAD
+            self._emit(GameEvent.LEVEL_COMPLETE, payload=True)
+        return hit_damages, new_health
+
+    def get_state_hash(self) -> str:
+        """
+        Digests the entities, the level and the random generator state, so two runs can be compared at a glance.
+        :return: Hexadecimal SHA-256 digest.
+        """
+
+        digest = hashlib.sha256()
+        digest.update(struct.pack("<iQb", self.level, self.level_seed, self.status.value))
+        digest.update(array("I", self.random.getstate()[1]).tobytes())
+        for values in self.entities.get_arrays():
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def step(self) -> None:
+        """
+        Advances the simulation by one tick: moves the character towards the target on every tick, a creature on
+        every relocate tick and applies creature damages on every danger tick.
+        :return:
+        """
+
+        if self.status != GameStatus.PLAYING:
+            return
+
+        self.tick += 1
+        if self.target is not None:
+            self.move_player(*self.target)
+        if self.status == GameStatus.PLAYING and self.tick % self.relocate_ticks == 0:
+            self.move_creatures()
+        if self.status == GameStatus.PLAYING and self.tick % self.danger_ticks == 0:
+            self.hit_by_creature()
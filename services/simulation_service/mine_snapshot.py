@@ -0,0 +1,152 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from enums.entity_kind import EntityKind
+from enums.game_status import GameStatus
+from enums.item_type import ItemType
+from services.interaction_service.path_finder import PathFinder
+from services.logging_service.logger import Logger
+from services.simulation_service.entity_store import EntityStore
+from services.simulation_service.mine_simulation import MineSimulation
+from services.simulation_service.tile_grid import TileGrid
+
+
+class MineSnapshot:
+    magic, version = b"TMSV", 1
+    # magic, version, columns, rows, object scale, level, level multiplier, level seed, tick, status, item,
+    # exit flag, exit column, exit row, exit digs, exit guard, character id, gauss flag, gauss value
+    header = struct.Struct("<4sHiiiiiQqbb?iii?i?d")
+    array_length = struct.Struct("<I")
+    random_typecode = "I"
+
+    @staticmethod
+    def _swap_byte_order(values: array) -> array:
+        """
+        Converts the array between the machine byte order and the little endian order of the file, like the header.
+        :param values: Array in either byte order.
+        :return: Array in the other byte order, the same array on little endian machines.
+        """
+
+        if sys.byteorder == "big":
+            values = array(values.typecode, values)
+            values.byteswap()
+        return values
+
+    @classmethod
+    def save(cls, simulation: MineSimulation, path: str) -> None:
+        """
+        Writes the mine into a compact binary file: a fixed header followed by the raw bytes of the random generator
+        state and of the entity arrays, each with its length. The grid is not written, as it only indexes the entity
+        positions. The file is replaced at once, so a crash while saving keeps the previous snapshot.
+        :param simulation: Simulation of the mine.
+        :param path: File path.
+        :return:
+        """
+
+        if simulation.chunk_streamer is not None:
+            raise ValueError("Endless mines cannot be saved")
+
+        _, random_state, gauss_next = simulation.random.getstate()
+        active_item = simulation.action_generator.active_item
+        exit_tile = simulation.exit_tile
+        header = cls.header.pack(
+            cls.magic,
+            cls.version,
+            simulation.columns,
+            simulation.rows,
+            simulation.object_scale,
+            simulation.level,
+            simulation.level_multiplier,
+            simulation.level_seed,
+            simulation.tick,
+            simulation.status.value,
+            -1 if active_item is None else list(ItemType).index(active_item),
+            exit_tile is not None,
+            *((0, 0) if exit_tile is None else exit_tile),
+            -1 if simulation.exit_digs is None else simulation.exit_digs,
+            bool(simulation.is_exit_guarded),
+            simulation.character_id,
+            gauss_next is not None,
+            0.0 if gauss_next is None else gauss_next
+        )
+
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(header)
+            for values in [array(cls.random_typecode, random_state)] + simulation.entities.get_arrays():
+                file.write(cls.array_length.pack(len(values)))
+                file.write(cls._swap_byte_order(values).tobytes())
+        os.replace(temporary_path, path)
+
+        Logger.info(f'Mine Snapshot: Save level {simulation.level} into {path} ({len(header)} byte header)')
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Restores a mine from a snapshot file, mapping the file into memory and copying each array in a single call.
+        :param path: File path.
+        :return: Simulation of the mine, None if there is no snapshot or it cannot be read by this version.
+        """
+
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                fields = cls.header.unpack_from(buffer, 0)
+                if fields[0] != cls.magic or fields[1] != cls.version:
+                    Logger.warning(f'Mine Snapshot: Skip {path} with unknown version {fields[1]}')
+                    return None
+
+                templates = [array(cls.random_typecode)] + EntityStore().get_arrays()
+                arrays, offset = [], cls.header.size
+                with memoryview(buffer) as view:
+                    for template in templates:
+                        length, = cls.array_length.unpack_from(buffer, offset)
+                        offset += cls.array_length.size
+                        values = array(template.typecode)
+                        values.frombytes(view[offset:offset + length * values.itemsize])
+                        offset += length * values.itemsize
+                        arrays.append(cls._swap_byte_order(values))
+        except (OSError, ValueError, struct.error) as error:
+            Logger.warning(f'Mine Snapshot: Skip unreadable {path} ({error})')
+            return None
+
+        (_, _, columns, rows, object_scale, level, level_multiplier, level_seed, tick, status, item, is_exit,
+         exit_column, exit_row, exit_digs, is_exit_guarded, character_id, is_gauss, gauss_next) = fields
+
+        simulation = MineSimulation(columns, rows, object_scale=object_scale)
+        simulation.random.setstate((3, tuple(arrays[0]), gauss_next if is_gauss else None))
+
+        entities = EntityStore.from_arrays(arrays[1:])
+        grid = TileGrid(columns, rows)
+        for kind in (EntityKind.OBSTACLE, EntityKind.CREATURE):
+            table = entities.tables[kind]
+            grid.place_all(table.ids, table.columns, table.rows)
+
+        simulation.entities, simulation.grid = entities, grid
+        simulation.path_finder = PathFinder(entities, grid)
+        simulation.character_id = character_id
+        simulation.exit_tile = (exit_column, exit_row) if is_exit else None
+        simulation.level, simulation.level_multiplier, simulation.level_seed = level, level_multiplier, level_seed
+        simulation.exit_digs, simulation.is_exit_guarded = None if exit_digs < 0 else exit_digs, is_exit_guarded
+        simulation.tick, simulation.status = tick, GameStatus(status)
+        if item >= 0:
+            simulation.select_item(list(ItemType)[item])
+
+        Logger.info(f'Mine Snapshot: Load level {level} from {path}')
+        return simulation
+
+    @staticmethod
+    def discard(path: str) -> None:
+        """
+        Deletes the snapshot, e.g. once the game it holds is over.
+        :param path: File path.
+        :return:
+        """
+
+        if os.path.exists(path):
+            os.remove(path)
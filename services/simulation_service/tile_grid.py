@@ -0,0 +1,145 @@
+import random
+
+neighbor_offsets = tuple((i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i or j)  # diagonals included
+
+
+class TileGrid:
+    def __init__(self, columns: int, rows: int):
+        self.columns = columns
+        self.rows = rows
+        self._cells = [None] * (columns * rows)
+
+    def is_inside(self, column: int, row: int) -> bool:
+        """
+        Determines whether the tile is inside the grid.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if inside, False otherwise.
+        """
+
+        return 0 <= column < self.columns and 0 <= row < self.rows
+
+    def get(self, column: int, row: int):
+        """
+        Returns the occupant of the tile.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: Occupant id, None if the tile is free or outside the grid.
+        """
+
+        if not self.is_inside(column, row):
+            return None
+        return self._cells[row * self.columns + column]
+
+    def is_free(self, column: int, row: int) -> bool:
+        """
+        Determines whether the tile is inside the grid and not occupied.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: True if free, False otherwise.
+        """
+
+        return self.is_inside(column, row) and self._cells[row * self.columns + column] is None
+
+    def place(self, column: int, row: int, occupant) -> None:
+        """
+        Marks the tile as occupied.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :param occupant: Occupant id.
+        :return:
+        """
+
+        self._cells[row * self.columns + column] = occupant
+
+    def place_all(self, occupants, columns, rows) -> None:
+        """
+        Marks the tiles of many occupants at once, e.g. when a saved mine is restored.
+        :param occupants: Occupant ids.
+        :param columns: Columns of the occupants.
+        :param rows: Rows of the occupants.
+        :return:
+        """
+
+        cells, width = self._cells, self.columns
+        for occupant, column, row in zip(occupants, columns, rows):
+            cells[row * width + column] = occupant
+
+    def remove(self, column: int, row: int):
+        """
+        Marks the tile as free.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :return: Previous occupant id.
+        """
+
+        index = row * self.columns + column
+        occupant, self._cells[index] = self._cells[index], None
+        return occupant
+
+    def move(self, column: int, row: int, new_column: int, new_row: int, occupant=None) -> None:
+        """
+        Moves the occupant of a tile into another one.
+        :param column: Current column of the occupant.
+        :param row: Current row of the occupant.
+        :param new_column: New column of the occupant.
+        :param new_row: New row of the occupant.
+        :param occupant: New occupant id, the current one is kept if not given.
+        :return:
+        """
+
+        previous_occupant = self.remove(column, row)
+        self.place(new_column, new_row, previous_occupant if occupant is None else occupant)
+
+    def neighbors(self, column: int, row: int, radius: int = 1) -> list:
+        """
+        Returns the occupants around the tile, including the tile itself.
+        :param column: Column of the tile.
+        :param row: Row of the tile.
+        :param radius: Distance in tiles.
+        :return: List of occupant ids.
+        """
+
+        occupants = []
+        for j in range(max(0, row - radius), min(self.rows, row + radius + 1)):
+            offset = j * self.columns
+            for i in range(max(0, column - radius), min(self.columns, column + radius + 1)):
+                occupant = self._cells[offset + i]
+                if occupant is not None:
+                    occupants.append(occupant)
+        return occupants
+
+    def count_free(self, border: int = 0) -> int:
+        """
+        Counts the free tiles, skipping the first columns and rows.
+        :param border: Number of columns and rows to skip from the origin.
+        :return: Number of free tiles.
+        """
+
+        return sum(
+            self._cells[j * self.columns + border:(j + 1) * self.columns].count(None) for j in range(border, self.rows)
+        )
+
+    def sample_free(self, amount: int, random_generator: random.Random, border: int = 0, excluded: tuple = ()) -> list:
+        """
+        Picks distinct free tiles in a single pass, without retrying on occupied ones.
+        :param amount: Number of tiles to pick.
+        :param random_generator: Source of randomness, seeded by the caller for reproducible picks.
+        :param border: Number of columns and rows to skip from the origin.
+        :param excluded: Tiles to be treated as occupied.
+        :return: List of columns and rows.
+        """
+
+        excluded_indexes = {row * self.columns + column for column, row in excluded}
+        free_indexes = [
+            j * self.columns + i
+            for j in range(border, self.rows)
+            for i in range(border, self.columns)
+            if self._cells[j * self.columns + i] is None and j * self.columns + i not in excluded_indexes
+        ]
+        if amount > len(free_indexes):
+            raise ValueError(f"Cannot place {amount} objects on {len(free_indexes)} free tiles")
+
+        return [
+            (index % self.columns, index // self.columns) for index in random_generator.sample(free_indexes, amount)
+        ]